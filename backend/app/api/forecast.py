@@ -7,6 +7,7 @@ from sqlalchemy import func
 from app.config import DEMO_DATE
 from app.schemas import ProductForecast
 from app.services.forecast import get_products_forecast
+from app.services.response_cache import cached_response
 from app.database import get_db
 from app.models import Forecast, Sales
 
@@ -15,6 +16,7 @@ router = APIRouter()
 today = DEMO_DATE
 
 @router.get("/products", response_model=List[ProductForecast])
+@cached_response("forecast/products", user_param="user_id")
 def get_products_forecast_api(
     period: str = Query("today"),
     user_id: Optional[int] = None,
@@ -23,6 +25,7 @@ def get_products_forecast_api(
     return get_products_forecast(db, period, user_id)
 
 @router.get("/revenue_summary")
+@cached_response("forecast/revenue_summary", user_param="user_id")
 def get_forecast_revenue_summary(
     prediction_date: Optional[date] = Query(None),
     user_id: Optional[int] = None,
@@ -54,6 +57,7 @@ def get_forecast_revenue_summary(
     return {"expectedRevenue": round(total_revenue, 2)}
 
 @router.get("/category_distribution")
+@cached_response("forecast/category_distribution", user_param="user_id")
 def get_category_distribution(
     period: str = Query("today"),    # today/tomorrow/nextWeek
     user_id: Optional[int] = None,
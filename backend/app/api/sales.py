@@ -3,8 +3,9 @@ from sqlmodel import Session
 from typing import List, Optional
 from ..database import get_db
 from ..services.sales import get_past_sales, get_daily_total_sales, get_daily_category_sales, get_daily_total_unit_sales, get_top_items_sold, get_latest_date
-from ..services.sales import get_daily_total_profit, get_bottom_items_sold
+from ..services.sales import get_daily_total_profit, get_bottom_items_sold, get_sales_dashboard
 from ..schemas import SalesOut
+from ..services.response_cache import cached_response
 
 router = APIRouter(prefix="/api/sales", tags=["sales"])
 
@@ -20,7 +21,24 @@ router = APIRouter(prefix="/api/sales", tags=["sales"])
 #     """
 #     return get_past_sales(db, start_date, end_date, limit)
 
+@router.get("/dashboard")
+@cached_response("sales/dashboard")
+def sales_dashboard(
+    start_date: Optional[str] = Query(None, description="Start date"),
+    end_date: Optional[str] = Query(None, description="End date"),
+    limit: int = Query(30, ge=1, description="Number of days in the daily series"),
+    top_limit: int = Query(5, ge=1, description="Top/bottom N items"),
+    item_days: Optional[int] = Query(None, ge=1, description="Rank items over only the last N days"),
+    db: Session = Depends(get_db)
+):
+    """
+    Daily revenue, category revenue, units and profit, top and bottom items and the
+    latest sales date in one response
+    """
+    return get_sales_dashboard(db, start_date, end_date, limit, top_limit, item_days)
+
 @router.get("/daily_total_revenue", response_model=List[dict])
+@cached_response("sales/daily_total_revenue")
 def daily_total_revenue(
     start_date: Optional[str] = Query(None, description="Start date"),
     end_date: Optional[str] = Query(None, description="End date"),
@@ -33,6 +51,7 @@ def daily_total_revenue(
     return get_daily_total_sales(db, start_date, end_date, limit)
 
 @router.get("/daily_category_revenue", response_model=List[dict])
+@cached_response("sales/daily_category_revenue")
 def daily_category_revenue(
     start_date: Optional[str] = Query(None, description="Start date"),
     end_date: Optional[str] = Query(None, description="End date"),
@@ -45,6 +64,7 @@ def daily_category_revenue(
     return get_daily_category_sales(db, start_date, end_date, limit)
 
 @router.get("/daily_total_unit_sales", response_model=List[dict])
+@cached_response("sales/daily_total_unit_sales")
 def daily_total_unit_sales(
     start_date: Optional[str] = Query(None, description="Start date"),
     end_date: Optional[str] = Query(None, description="End date"),
@@ -54,6 +74,7 @@ def daily_total_unit_sales(
     return get_daily_total_unit_sales(db, start_date, end_date, limit)
 
 @router.get("/top_items_sold", response_model=List[dict])
+@cached_response("sales/top_items_sold")
 def top_items_sold(
     start_date: Optional[str] = Query(None, description="Start date"),
     end_date: Optional[str] = Query(None, description="End date"),
@@ -63,11 +84,13 @@ def top_items_sold(
     return get_top_items_sold(db, start_date, end_date, limit)
 
 @router.get("/latest_date")
+@cached_response("sales/latest_date")
 def latest_date(db: Session = Depends(get_db)):
     date = get_latest_date(db)
     return {"latest_date": date}
 
 @router.get("/daily_total_profit", response_model=List[dict])
+@cached_response("sales/daily_total_profit")
 def daily_total_profit(
     start_date: Optional[str] = Query(None, description="Start date"),
     end_date: Optional[str] = Query(None, description="End date"),
@@ -80,6 +103,7 @@ def daily_total_profit(
     return get_daily_total_profit(db, start_date, end_date, limit)
 
 @router.get("/bottom_items_sold", response_model=List[dict])
+@cached_response("sales/bottom_items_sold")
 def bottom_items_sold(
     start_date: Optional[str] = Query(None, description="Start date"),
     end_date: Optional[str] = Query(None, description="End date"),
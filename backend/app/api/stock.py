@@ -1,36 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.models import Stock
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import Literal, Optional
 from app.database import get_db
 from app.models import User
+from app.schemas import StockAdjustRequest, StockMovementRequest
+from app.core.security import get_current_user
+from app.services.replenishment import list_recommendations
+from app.services.stock import (
+    STOCK_FIELDS, adjust_stock, list_stock, list_stock_categories, record_inventory_movements
+)
 
 router = APIRouter()
     
 @router.get("/api/stock")
 def get_stock_items(
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    after_id: Optional[int] = Query(None, description="Return rows after this id (next_after_id of the previous page)"),
+    category: Optional[str] = Query(None, description="Only this item_category"),
+    max_inventory: Optional[int] = Query(None, description="Only rows with item_inventory <= this"),
+    max_days_left: Optional[float] = Query(None, ge=0, description="Only rows running out within this many days"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,item_name,item_inventory"),
     session: Session = Depends(get_db),
     # 🔴 Comment this out or remove it for now
     # current_user: User = Depends(get_current_user)
 ):
+    """Keyset-paginated stock list; `total` is only set on the first page."""
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    unknown = set(field_list or []) - STOCK_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {sorted(unknown)}")
     try:
-        stock_items = session.exec(
-            select(Stock)
-        ).all()
-        return stock_items
+        return list_stock(
+            session,
+            limit=limit,
+            after_id=after_id,
+            category=category,
+            max_inventory=max_inventory,
+            max_days_left=max_days_left,
+            fields=field_list
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch stock data: {str(e)}")
 
+@router.get("/api/stock/categories")
+def get_stock_categories(session: Session = Depends(get_db)):
+    """Distinct item categories with their row counts, for category filters."""
+    try:
+        return list_stock_categories(session)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch stock categories: {str(e)}")
+
+@router.get("/api/stock/recommendations")
+def get_stock_recommendations(
+    sort: Literal["days_of_cover", "suggested_order_qty", "daily_demand", "item_name"] = Query("days_of_cover"),
+    priority: Optional[Literal["urgent", "medium", "low"]] = Query(None),
+    category: Optional[str] = Query(None, description="Only this item_category"),
+    reorder_only: bool = Query(False, description="Only items with a suggested order"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Precomputed days of cover, reorder point and suggested order quantity for the user's store."""
+    return list_recommendations(
+        session,
+        current_user.store_nbr,
+        sort=sort,
+        priority=priority,
+        category=category,
+        reorder_only=reorder_only,
+        limit=limit,
+        offset=offset
+    )
+
 @router.put("/api/stock/update/{stock_id}")
 def update_stock_quantity(stock_id: int, added_quantity: int, session: Session = Depends(get_db)):
-    stock_item = session.get(Stock, stock_id)
-    if not stock_item:
+    try:
+        return adjust_stock(session, [{"stock_id": stock_id, "delta": added_quantity}])[0]
+    except LookupError:
         raise HTTPException(status_code=404, detail="Stock item not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update stock: {str(e)}")
+
+@router.post("/api/stock/adjust")
+def adjust_stock_levels(request: StockAdjustRequest, session: Session = Depends(get_db)):
+    """Apply a batch of inventory deltas in one transaction: all of them or none."""
+    try:
+        updated = adjust_stock(session, [a.model_dump() for a in request.adjustments])
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=f"Stock adjustment rejected: {str(e)}")
+    return {"updated": updated}
 
-    stock_item.item_inventory += added_quantity
-    session.add(stock_item)
-    session.commit()
-    session.refresh(stock_item)
-    return stock_item
+@router.post("/api/stock/movements", status_code=202)
+def record_stock_movements(request: StockMovementRequest, session: Session = Depends(get_db)):
+    """
+    Append inventory events (scanner sales, receipts, write-offs) to the movement ledger.
+    Stock reads include them right away; the scheduler folds them into the snapshot.
+    """
+    try:
+        recorded = record_inventory_movements(session, [m.model_dump() for m in request.movements])
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=f"Movements rejected: {str(e)}")
+    return {"recorded": recorded}
 
 from app.services.stock import update_daily_sales_rate
 
@@ -3,45 +3,159 @@ from sqlmodel import Session
 from typing import Optional
 
 from ..database import get_db
-from ..models import User
+from ..models import User, Upload
 from ..core.security import get_current_user
-from ..services.upload import process_upload_file
+from ..services.upload import ingest_upload_chunk, preflight_upload
+from ..services.upload_jobs import (
+    complete_chunked_upload, enqueue_upload, start_chunked_upload, upload_job_status
+)
+from ..services.upload_reader import SUPPORTED_EXTENSIONS
 
 router = APIRouter()
 
 
-@router.post("/upload")
-async def upload_file(
+def _check_supported_file(filename: Optional[str]):
+    # Columnar formats arrive with unreliable content types (often application/octet-stream),
+    # so the file extension decides
+    if not (filename or "").lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only CSV (optionally .gz/.zst compressed), Excel, Parquet or Arrow IPC files are supported.")
+
+
+def _get_own_upload(job_id: int, session: Session, current_user: User) -> Upload:
+    upload = session.get(Upload, job_id)
+    if not upload or upload.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.post("/upload", status_code=202)
+def upload_file(
     file: UploadFile = File(...),
     prediction_type: str = Query("today", enum=["today", "tomorrow", "7days"]),
+    ingest_mode: str = Query("auto", enum=["auto", "insert", "copy"]),
+    memory_limit_mb: Optional[int] = Query(None, ge=16),
     session: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Upload sales data files and perform forecasts (supports today/tomorrow/7 days).
-    Automatically write to the Sales table, record the Upload table, perform forecasts, and return summary and chart data.
+    Upload sales data files and queue a forecast job (supports today/tomorrow/7 days).
+    The file is stored and an Upload row is created with status "queued"; a background worker
+    writes the Sales table, refreshes stock and runs the forecast. Poll GET /api/upload/{job_id}.
     """
-    if file.content_type not in [
-        "text/csv",
-        "application/vnd.ms-excel",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    ]:
-        raise HTTPException(status_code=400, detail="Only CSV or Excel files are supported.")
+    _check_supported_file(file.filename)
 
     try:
-        result = await process_upload_file(
+        upload = enqueue_upload(
             file=file,
             user=current_user,
             session=session,
-            prediction_type=prediction_type
+            prediction_type=prediction_type,
+            ingest_mode=ingest_mode,
+            memory_limit_mb=memory_limit_mb
         )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Upload failed: ❌ {str(e)}")
 
+    if upload.duplicate_of:
         return {
-            "message": f"✅ {prediction_type.title()} prediction completed.",
-            "rows_inserted": result["rows_inserted"],
-            "summary": result["prediction_summary"],
-            "chart_data": result["chart_data"]
+            "message": "✅ Identical upload already processed, reusing its forecast.",
+            **upload_job_status(upload)
         }
 
+    return {
+        "message": f"⏳ {prediction_type.title()} prediction queued.",
+        "job_id": upload.id,
+        "status": upload.status
+    }
+
+
+@router.post("/upload/validate")
+def validate_upload(
+    file: UploadFile = File(...),
+    file_size: Optional[int] = Query(None, ge=0, description="Size of the whole file when only its beginning is sent (plain CSV)"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Pre-flight check of an upload: reads only the header and a sample of rows and reports
+    missing columns, column dtypes, the sample's date range and an estimated row count.
+    Plain CSV clients can send just the first few hundred KB of the file.
+    """
+    _check_supported_file(file.filename)
+    try:
+        return preflight_upload(file.file, file.filename, current_user.store_nbr, file_size=file_size)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Upload failed: ❌ {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Could not read file: ❌ {str(e)}")
+
+
+@router.get("/upload/{job_id}")
+def get_upload_status(
+    job_id: int,
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Progress of an upload job: status, current stage, stage timings and, once processed,
+    the prediction summary and chart data.
+    """
+    return upload_job_status(_get_own_upload(job_id, session, current_user))
+
+
+@router.post("/upload/chunked", status_code=201)
+def start_chunked(
+    filename: str = Query(..., description="Name of the whole file; its extension sets the chunk format"),
+    total_chunks: Optional[int] = Query(None, ge=1),
+    prediction_type: str = Query("today", enum=["today", "tomorrow", "7days"]),
+    ingest_mode: str = Query("auto", enum=["auto", "insert", "copy"]),
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload. Send chunks 0, 1, 2, ... with PUT /api/upload/{job_id}/chunks/{n};
+    each chunk is a complete file (header included) holding the next slice of rows.
+    After a failure, GET /api/upload/{job_id} and continue from chunks_committed.
+    """
+    _check_supported_file(filename)
+    upload = start_chunked_upload(
+        filename, current_user, session,
+        prediction_type=prediction_type, ingest_mode=ingest_mode, total_chunks=total_chunks
+    )
+    return {"job_id": upload.id, "status": upload.status, "next_chunk": upload.chunks_committed}
+
+
+@router.put("/upload/{job_id}/chunks/{chunk_index}")
+def put_upload_chunk(
+    job_id: int,
+    chunk_index: int,
+    file: UploadFile = File(...),
+    memory_limit_mb: Optional[int] = Query(None, ge=16),
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Commit one chunk (idempotent: a chunk that is already committed is acknowledged and skipped)."""
+    _get_own_upload(job_id, session, current_user)
+    try:
+        upload = ingest_upload_chunk(job_id, chunk_index, file.file, current_user, session, memory_limit_mb)
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=f"Chunk {chunk_index} rejected: ❌ {str(e)}")
+    return {
+        "job_id": upload.id,
+        "chunks_committed": upload.chunks_committed,
+        "next_chunk": upload.chunks_committed,
+        "rows_received": (upload.checkpoint or {}).get("rows_received", 0)
+    }
+
+
+@router.post("/upload/{job_id}/complete", status_code=202)
+def complete_chunked(
+    job_id: int,
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Close a chunked upload and queue the stock refresh and forecast."""
+    upload = _get_own_upload(job_id, session, current_user)
+    try:
+        upload = complete_chunked_upload(upload, session)
+    except Exception as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": f"⏳ {upload.prediction_type.title()} prediction queued.", "job_id": upload.id, "status": upload.status}
@@ -6,6 +6,30 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Uploads with at least this many rows use the COPY staging ingest path
+    COPY_INGEST_ROW_THRESHOLD: int = 100000
+    # Ceiling for the decoded chunk of a single upload, in MB
+    UPLOAD_MEMORY_LIMIT_MB: int = 256
+    # Background upload jobs: where queued files are kept and how many run at once
+    UPLOAD_DIR: str = "uploads"
+    UPLOAD_WORKERS: int = 2
+    # In-process scheduler for periodic maintenance jobs (stock population, sales velocity, ...)
+    SCHEDULER_ENABLED: bool = True
+    # Stock rows for new Product rows; also runs shortly after boot instead of in startup
+    STOCK_POPULATE_MINUTES: int = 360
+    # Replenishment metrics: rebuilt after every forecast and on this interval; reorder
+    # point = demand * (lead time + safety days), order up to + review period days
+    REPLENISHMENT_REFRESH_MINUTES: int = 15
+    REPLENISH_LEAD_TIME_DAYS: float = 2
+    REPLENISH_SAFETY_DAYS: float = 2
+    REPLENISH_REVIEW_DAYS: float = 7
+    VELOCITY_REFRESH_MINUTES: int = 60
+    # How often pending inventory movements are folded into Stock.item_inventory
+    INVENTORY_COMPACT_SECONDS: int = 60
+
+    # Cached /api/sales and /api/forecast responses: max age and total size
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_MB: int = 32
 
     class Config:
         env_file = ".env"
@@ -1,13 +1,135 @@
+import zlib
+from typing import Hashable, Iterable, Optional
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import text
 from .core.config import settings
 from sqlalchemy.orm import sessionmaker  
 engine = create_engine(settings.DATABASE_URL, echo=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# create_all() does not touch existing tables: stock tables created before the
+# (item_nbr, date) unique constraint get it here, keeping the oldest duplicate row
+_STOCK_UNIQUE_SQL = text("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_stock_item_date') THEN
+            DELETE FROM stock a USING stock b
+            WHERE a.item_nbr = b.item_nbr AND a.date = b.date AND a.id > b.id;
+            ALTER TABLE stock ADD CONSTRAINT unique_stock_item_date UNIQUE (item_nbr, date);
+        END IF;
+    END $$
+""")
+
+
+# Stock velocity columns added after the table was first created
+_STOCK_VELOCITY_COLUMNS = {
+    "velocity_7d": "double precision",
+    "velocity_28d": "double precision",
+    "velocity_90d": "double precision",
+    "velocity_updated_at": "timestamp",
+}
+
+
+# Upload columns added after the table was first created (background jobs, duplicate
+# detection, chunked uploads)
+_UPLOAD_COLUMNS = {
+    "file_path": "varchar",
+    "prediction_type": "varchar",
+    "ingest_mode": "varchar",
+    "stage": "varchar",
+    "stage_timings": "json",
+    "result": "json",
+    "error": "varchar",
+    "started_at": "timestamp",
+    "finished_at": "timestamp",
+    "content_hash": "varchar",
+    "duplicate_of": "integer",
+    "total_chunks": "integer",
+    "chunks_committed": "integer",
+    "checkpoint": "json",
+}
+
+
+def _add_missing_columns(conn, table: str, columns: dict):
+    """
+    ALTER TABLE ... ADD COLUMN for the columns the table does not have yet. The catalog is
+    checked first, so an up-to-date database takes no ACCESS EXCLUSIVE lock at boot.
+    """
+    existing = set(conn.execute(
+        text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table"
+        ),
+        {"table": table}
+    ).scalars())
+    missing = [f"ADD COLUMN IF NOT EXISTS {name} {ddl}" for name, ddl in columns.items() if name not in existing]
+    if missing:
+        conn.execute(text(f"ALTER TABLE {table} {', '.join(missing)}"))
+
+
+def _create_missing_index(conn, name: str, ddl: str):
+    """Run CREATE INDEX only when the index does not exist yet (it locks the table even as a no-op)."""
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+        conn.execute(text(ddl))
+
+
 def create_db_and_tables():
-    from .models import User, Product, Sales, Forecast, Upload, POSConnection
+    from .models import User, Product, Sales, Forecast, Upload, POSConnection, Stock, ItemSalesStats, InventoryMovement, ScheduledJobRun, Replenishment, SalesDaily, DataVersion
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _add_missing_columns(conn, "upload", _UPLOAD_COLUMNS)
+        _create_missing_index(conn, "ix_upload_content_hash", "CREATE INDEX ix_upload_content_hash ON upload (content_hash)")
+        conn.execute(_STOCK_UNIQUE_SQL)
+        _create_missing_index(conn, "ix_sales_item_nbr_date", "CREATE INDEX ix_sales_item_nbr_date ON sales (item_nbr, date)")
+        _add_missing_columns(conn, "stock", _STOCK_VELOCITY_COLUMNS)
+        _create_missing_index(conn, "ix_stock_category_id", "CREATE INDEX ix_stock_category_id ON stock (item_category, id)")
+
+
+def advisory_lock_key(name: str) -> int:
+    """Postgres advisory lock key for a lock name, the same in every process."""
+    return zlib.crc32(name.encode())
+
+
+def try_advisory_xact_lock(session: Session, name: str) -> bool:
+    """
+    Take a transaction-scoped Postgres advisory lock named after a job, without waiting.
+    It is shared by every process on the database and released at commit/rollback.
+    """
+    key = advisory_lock_key(name)
+    return session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key}).scalar()
+
+
+# Row-level advisory locks are striped: at most ADVISORY_LOCK_STRIPES locks per name,
+# however many ids a transaction touches (each one uses a slot of the shared lock table)
+ADVISORY_LOCK_STRIPES = 256
+
+
+def _lock_id(value) -> str:
+    # str(), not repr(): numpy and Python ints must land on the same stripe
+    if isinstance(value, tuple):
+        return ":".join(str(part) for part in value)
+    return str(value)
+
+
+def advisory_xact_lock_all(session: Session, name: str, ids: Optional[Iterable[Hashable]] = None):
+    """
+    Block until this transaction holds the advisory locks of ids (every stripe when None)
+    under name. Keys are taken in sorted order, so transactions locking overlapping sets
+    cannot deadlock. Take them in their own statement: under READ COMMITTED the statements
+    after it then see what the previous holder committed.
+    """
+    if ids is None:
+        stripes = range(ADVISORY_LOCK_STRIPES)
+    else:
+        stripes = {zlib.crc32(_lock_id(i).encode()) % ADVISORY_LOCK_STRIPES for i in ids}
+    keys = sorted(advisory_lock_key(f"{name}:{stripe}") for stripe in stripes)
+    if keys:
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(key) FROM unnest(CAST(:keys AS bigint[])) AS key ORDER BY key"),
+            {"keys": keys}
+        )
+
 
 def get_db():
     with Session(engine) as session:
@@ -48,10 +48,20 @@ app.include_router(stock.router)
 @app.on_event("startup")
 def startup_tasks():
     create_db_and_tables()
-    from app.database import SessionLocal
-    from app.services.stock import populate_stock_from_product
-    with Session(engine) as session:
-        populate_stock_from_product(session) 
+    # Uploads queued or running when the previous process stopped
+    from app.services.upload_jobs import recover_upload_jobs
+    recover_upload_jobs()
+    # Stock population is a scheduler job: one worker runs it in the background
+    # after boot, so startup does not scan Product/Sales
+    from app.services.scheduler import start_scheduler
+    start_scheduler()
+
+@app.on_event("shutdown")
+def shutdown_tasks():
+    from app.services.scheduler import stop_scheduler
+    from app.services.upload_jobs import shutdown_upload_workers
+    stop_scheduler()
+    shutdown_upload_workers()
 
 # Optional: Root route
 @app.get("/")
@@ -71,6 +81,11 @@ app.include_router(sales_router)
 # Mount static folders for easy management
 app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(__file__), "static")), name="static")
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    from app.services.response_cache import response_cache
+    return response_cache.stats()
+
 @app.get("/api/download-template")
 def download_template():
     file_path = os.path.join(os.path.dirname(__file__), "static", "sample_template.csv")
@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from datetime import datetime, date
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index, Column, JSON, text
 
 # --- User Table ---
 class User(SQLModel, table=True):
@@ -32,7 +32,11 @@ class Product(SQLModel, table=True):
 
 # --- Sales Table ---
 class Sales(SQLModel, table=True):
-    __table_args__ = (UniqueConstraint("date", "store_nbr", "item_nbr", name="unique_date_store_item"),)
+    __table_args__ = (
+        UniqueConstraint("date", "store_nbr", "item_nbr", name="unique_date_store_item"),
+        # Per-item lookups (sales stats refresh) without scanning the whole table
+        Index("ix_sales_item_nbr_date", "item_nbr", "date"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     date: date
@@ -48,15 +52,51 @@ class Sales(SQLModel, table=True):
     price: Optional[float]
     cost_price: Optional[float]
 
+# --- SalesDaily Table ---
+# Per (store_nbr, date, category) totals of Sales, re-aggregated by each upload for the
+# days it changed; the daily dashboard endpoints read this instead of raw sales
+class SalesDaily(SQLModel, table=True):
+    __table_args__ = (
+        # Upsert key; NULL categories share one row per store/day
+        Index("ux_salesdaily_store_date_category", "store_nbr", "date", text("COALESCE(category, '')"), unique=True),
+        Index("ix_salesdaily_date", "date"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    store_nbr: int
+    date: date
+    category: Optional[str]
+    revenue: Optional[float]  # sum(unit_sales * price)
+    units: Optional[float]  # sum(unit_sales)
+    profit: Optional[float]  # sum((price - cost_price) * unit_sales)
+    row_count: int
+
 # --- Upload Table ---
 class Upload(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)
     filename: str
-    status: str
+    status: str  # receiving / queued / running / processed / failed
     row_count: Optional[int]
     created_at: datetime = Field(default_factory=datetime.utcnow)
     store_nbr: int = Field(index=True)
+    # Background job state
+    file_path: Optional[str] = None
+    prediction_type: Optional[str] = None
+    ingest_mode: Optional[str] = None
+    stage: Optional[str] = None
+    stage_timings: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    result: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # sha256 of the uploaded bytes; identical re-uploads reuse the earlier result
+    content_hash: Optional[str] = Field(default=None, index=True)
+    duplicate_of: Optional[int] = None
+    # Resumable chunked uploads: chunks 0..chunks_committed-1 are committed, running totals in checkpoint
+    total_chunks: Optional[int] = None
+    chunks_committed: Optional[int] = None
+    checkpoint: Optional[dict] = Field(default=None, sa_column=Column(JSON))
 
     user: Optional[User] = Relationship(back_populates="uploads")
 
@@ -95,6 +135,12 @@ class Forecast(SQLModel, table=True):
     user: Optional[User] = Relationship(back_populates="forecasts")
 
 class Stock(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("item_nbr", "date", name="unique_stock_item_date"),
+        # Keyset pages of one category
+        Index("ix_stock_category_id", "item_category", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     item_nbr: int
     item_name: str
@@ -103,3 +149,71 @@ class Stock(SQLModel, table=True):
     date: date
     created_at: datetime = Field(default_factory=datetime.utcnow)
     daily_sales_rate: Optional[float] = Field(default=0)
+    # Units per day over the last 7/28/90 days (all stores), refreshed by the scheduler
+    velocity_7d: Optional[float] = None
+    velocity_28d: Optional[float] = None
+    velocity_90d: Optional[float] = None
+    velocity_updated_at: Optional[datetime] = None
+
+# --- InventoryMovement Table ---
+# Append-only inventory events (scanner sales, receipts, write-offs). Inserting one never
+# touches the Stock row, so frequent events do not contend on its row lock; the compactor
+# periodically folds pending movements into Stock.item_inventory and stamps compacted_at.
+# Current level = Stock.item_inventory + sum(delta) of the item's pending movements.
+class InventoryMovement(SQLModel, table=True):
+    __table_args__ = (
+        # Only pending movements are read (by stock reads and the compactor)
+        Index("ix_inventorymovement_pending", "stock_id", postgresql_where=text("compacted_at IS NULL")),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    stock_id: int
+    kind: str  # "sale", "receipt", "writeoff", "adjustment"
+    delta: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    compacted_at: Optional[datetime] = None
+
+# --- Replenishment Table ---
+# Precomputed reorder metrics per store item, rebuilt after each forecast run and by the
+# scheduler (services/replenishment.py); served by GET /api/stock/recommendations
+class Replenishment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_replenishment_store_cover", "store_nbr", "days_of_cover"),
+    )
+
+    store_nbr: int = Field(primary_key=True)
+    item_nbr: int = Field(primary_key=True)
+    stock_id: int
+    item_name: str
+    item_category: str
+    current_inventory: int
+    daily_demand: float
+    demand_source: str  # "forecast", "velocity", "average" or "none"
+    days_of_cover: Optional[float] = None  # None when there is no demand
+    reorder_point: float
+    order_up_to: float
+    suggested_order_qty: int
+    priority: str  # "urgent", "medium", "low"
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+# --- ScheduledJobRun Table ---
+# When each scheduler job last finished, for jobs whose own tables carry no timestamp
+class ScheduledJobRun(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+    finished_at: datetime
+
+# --- DataVersion Table ---
+# Counter per store, bumped in the same transaction as every change to the store's
+# Sales/Forecast data; cached analytics responses are only served at the current version
+class DataVersion(SQLModel, table=True):
+    store_nbr: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    version: int = Field(default=0)
+
+# --- ItemSalesStats Table ---
+# Running per-item sales aggregate (all stores) behind Stock.daily_sales_rate,
+# refreshed for the items an upload changes in the same transaction as the Sales upsert
+class ItemSalesStats(SQLModel, table=True):
+    item_nbr: int = Field(primary_key=True)
+    total_units: float = Field(default=0)
+    sales_days: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Literal, Optional
 from datetime import date
 from pydantic import BaseModel
 import re
@@ -59,3 +59,24 @@ class SalesOut(SalesBase):
 class ProductForecast(BaseModel):
     name: str
     expected: float
+
+
+class StockAdjustment(BaseModel):
+    stock_id: Optional[int] = None
+    item_nbr: Optional[int] = None  # the item's latest-dated Stock row
+    delta: int
+
+    @model_validator(mode='after')
+    def one_target(self):
+        if (self.stock_id is None) == (self.item_nbr is None):
+            raise ValueError('Give exactly one of stock_id or item_nbr')
+        return self
+
+class StockAdjustRequest(BaseModel):
+    adjustments: list[StockAdjustment] = Field(min_length=1, max_length=10000)
+
+class StockMovement(StockAdjustment):
+    kind: Literal["sale", "receipt", "writeoff", "adjustment"] = "adjustment"
+
+class StockMovementRequest(BaseModel):
+    movements: list[StockMovement] = Field(min_length=1, max_length=10000)
@@ -306,8 +306,8 @@ class LocalSalesPredictor:
         
         return True
     
-    def preprocess_data(self, df):
-        """Preprocess data"""
+    def preprocess_data(self, df, pivot_dates=None):
+        """Preprocess data (pivot_dates: full list of date columns when df holds only some items)"""
         print("🔧 Preprocessing data...")
         
         # Validate data
@@ -316,6 +316,10 @@ class LocalSalesPredictor:
         # Create pivot tables
         df_pivot = df.set_index(['store_nbr', 'item_nbr', 'date'])['unit_sales'].unstack(-1).fillna(0)
         promo_pivot = df.set_index(['store_nbr', 'item_nbr', 'date'])['onpromotion'].unstack(-1).fillna(False)
+        if pivot_dates is not None:
+            date_columns = pd.DatetimeIndex(sorted(pd.to_datetime(pivot_dates)))
+            df_pivot = df_pivot.reindex(columns=date_columns, fill_value=0)
+            promo_pivot = promo_pivot.reindex(columns=date_columns, fill_value=False)
         items = df[['item_nbr', 'category', 'item_class', 'perishable']].drop_duplicates().set_index('item_nbr')
         
         print(f"   📊 Pivot table shape: {df_pivot.shape}")
@@ -568,7 +572,7 @@ class LocalSalesPredictor:
         
         print(f"   ✅ Added {len(additional_features)} additional features")
     
-    def predict(self, input_data, prediction_date=None, save_result=True):
+    def predict(self, input_data, prediction_date=None, save_result=True, pivot_dates=None):
         """
         Predict sales
         
@@ -576,6 +580,7 @@ class LocalSalesPredictor:
         - input_data: DataFrame or CSV file path
         - prediction_date: Prediction date (str "YYYY-MM-DD" or None for auto)
         - save_result: Whether to save results to CSV
+        - pivot_dates: All dates of the store's history window, when input_data is a subset of items
         
         Returns:
         - DataFrame: Prediction results
@@ -601,7 +606,7 @@ class LocalSalesPredictor:
         print(f"   📊 Input data: {len(df)} records")
         
         # Preprocess data
-        df_pivot, promo_pivot, items = self.preprocess_data(df)
+        df_pivot, promo_pivot, items = self.preprocess_data(df, pivot_dates=pivot_dates)
         
         # Determine prediction date
         if prediction_date is None:
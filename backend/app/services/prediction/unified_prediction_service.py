@@ -24,7 +24,9 @@ from datetime import datetime, timedelta
 from io import StringIO
 from app.models import Forecast
 from app.database import get_db
-from typing import Optional
+from app.services.response_cache import response_cache
+from typing import Iterable, Optional
+from sqlalchemy import tuple_
 from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import Session, select
 from app.models import Sales
@@ -114,6 +116,8 @@ def save_forecast_results(predictions: list[dict], user_id: int, model_version:
             )
 
             session.execute(stmt)
+            for store_nbr in sorted(df_insert["store_nbr"].unique()):
+                response_cache.bump_data_version(session, int(store_nbr))
             session.commit()
         except Exception as e:
             import traceback
@@ -163,7 +167,7 @@ class UnifiedPredictionService:
         return self.predictor.load_model()
     
     def predict(self, data_source, prediction_type='tomorrow', save_results=True, user_id: int = 1,
-                db: Optional[Session] = None):
+                db: Optional[Session] = None, changed_keys: Optional[Iterable[tuple]] = None):
         """
         Make predictions for different time periods
         
@@ -171,6 +175,8 @@ class UnifiedPredictionService:
             data_source (str): Path to data file or URL
             prediction_type (str): 'today', 'tomorrow', or '7days'
             save_results (bool): Whether to save results to files
+            changed_keys: (store_nbr, item_nbr) pairs to re-forecast when loading from the DB;
+                None re-forecasts the whole store
             
         Returns:
             dict: Prediction results with chart data
@@ -178,6 +184,7 @@ class UnifiedPredictionService:
         print(f"🚀 {prediction_type.title()} Sales Prediction")
         print("=" * 50)
                 
+        pivot_dates = None
         if isinstance(data_source, pd.DataFrame):
             df = data_source.copy()
             print(f"📊 Using provided DataFrame with {len(df)} records")
@@ -199,16 +206,42 @@ class UnifiedPredictionService:
 
             print(f"🛢️ Loading sales data from DB for user {user_id}, date range: {start_date} to {today}")
             # Step 1: Query sales table
+            store_nbr = self._get_user_store(db, user_id)
             stmt_sales = select(Sales).where(
-                Sales.store_nbr == self._get_user_store(db, user_id),
+                Sales.store_nbr == store_nbr,
                 Sales.date.between(start_date, today)
             )
+            if changed_keys is not None:
+                changed_keys = list(changed_keys)
+                print(f"🎯 Re-forecasting {len(changed_keys)} changed store/item pairs only")
+                stmt_sales = stmt_sales.where(tuple_(Sales.store_nbr, Sales.item_nbr).in_(changed_keys))
+                # Features are computed over the store's full date grid, exactly as in a
+                # whole-store run, so days on which none of these items sold still count as zeros
+                pivot_dates = db.exec(
+                    select(Sales.date).distinct().where(
+                        Sales.store_nbr == store_nbr,
+                        Sales.date.between(start_date, today)
+                    )
+                ).all()
             sales_rows = db.exec(stmt_sales).all()
             df_sales = pd.DataFrame([row.dict() for row in sales_rows])
+            if changed_keys is not None:
+                # Changed pairs without sales in the window have no history to forecast from
+                if df_sales.empty:
+                    print("⚠️ None of the changed store/item pairs has sales in the window, skipping the forecast")
+                    return self._empty_results(prediction_type)
+                changed_keys = list(
+                    df_sales[["store_nbr", "item_nbr"]].drop_duplicates().itertuples(index=False, name=None)
+                )
 
             # Step 2: Query product table
             from app.models import Product
             stmt_product = select(Product.item_nbr, Product.item_name)
+            if changed_keys is not None:
+                stmt_product = stmt_product.where(
+                    Product.store_nbr == store_nbr,
+                    Product.item_nbr.in_([item_nbr for _, item_nbr in changed_keys])
+                )
             product_rows = db.exec(stmt_product).all()
             df_product = pd.DataFrame(product_rows, columns=["item_nbr", "item_name"])
 
@@ -262,7 +295,8 @@ class UnifiedPredictionService:
                 daily_prediction = self.predictor.predict(
                     input_data=df,
                     prediction_date=date_str,
-                    save_result=False
+                    save_result=False,
+                    pivot_dates=pivot_dates
                 )
                 
                 if daily_prediction is not None and len(daily_prediction) > 0:
@@ -363,6 +397,18 @@ class UnifiedPredictionService:
 
         return results
     
+    def _empty_results(self, prediction_type):
+        """Results of a run that had nothing to forecast; no forecast rows are written."""
+        return {
+            'prediction_type': prediction_type,
+            'prediction_dates': [date_str for _, date_str, _ in self._get_prediction_dates(prediction_type)],
+            'data_info': {'total_records': 0, 'unique_items': 0, 'unique_stores': 0},
+            'summary': {},
+            'detailed_predictions': [],
+            'chart_data': {},
+            'generated_at': datetime.now().isoformat()
+        }
+
     def _get_prediction_dates(self, prediction_type):
         """Get prediction dates based on type"""
 
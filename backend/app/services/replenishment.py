@@ -0,0 +1,160 @@
+# backend/app/services/replenishment.py
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select, func
+
+from app.config import DEMO_DATE
+from app.core.config import settings
+from app.database import advisory_xact_lock_all
+from app.models import Replenishment, User
+
+# Forecast horizon the demand rate is averaged over (the "nextWeek" window of the forecast API):
+# the FORECAST_HORIZON_DAYS days from DEMO_DATE on, end excluded
+FORECAST_HORIZON_DAYS = 7
+
+# Everything the metrics need, one row per Stock item (its latest-dated row): current level
+# (snapshot + pending movements), the store's mean forecast over the horizon, and the
+# sales velocities used when an item has no forecast
+_REPLENISHMENT_INPUTS_SQL = text("""
+    WITH latest AS (
+        SELECT DISTINCT ON (item_nbr)
+            id, item_nbr, item_name, item_category, item_inventory, velocity_28d, daily_sales_rate
+        FROM stock
+        ORDER BY item_nbr, date DESC, id DESC
+    ), pending AS (
+        SELECT stock_id, SUM(delta) AS delta
+        FROM inventorymovement
+        WHERE compacted_at IS NULL
+        GROUP BY stock_id
+    ), forecast_demand AS (
+        SELECT item_nbr, AVG(predicted_sales) AS demand
+        FROM forecast
+        WHERE store_nbr = :store_nbr AND prediction_date >= :start AND prediction_date < :end
+        GROUP BY item_nbr
+    )
+    SELECT
+        l.id AS stock_id, l.item_nbr, l.item_name, l.item_category,
+        l.item_inventory + COALESCE(p.delta, 0) AS current_inventory,
+        f.demand AS forecast_demand, l.velocity_28d, l.daily_sales_rate
+    FROM latest l
+    LEFT JOIN pending p ON p.stock_id = l.id
+    LEFT JOIN forecast_demand f ON f.item_nbr = l.item_nbr
+""")
+
+RECOMMENDATION_SORTS = {
+    "days_of_cover": Replenishment.days_of_cover.asc().nulls_last(),
+    "suggested_order_qty": Replenishment.suggested_order_qty.desc(),
+    "daily_demand": Replenishment.daily_demand.desc(),
+    "item_name": Replenishment.item_name.asc(),
+}
+
+
+def compute_replenishment(inputs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Days of cover, reorder point and order quantity for every item, whole columns at a time.
+    Demand is the forecast when there is one, else the 28-day velocity, else the lifetime
+    average. Items at or below the reorder point are ordered up to lead time + review
+    period + safety days of demand; "urgent" ones run out before a delivery could arrive.
+    """
+    lead = settings.REPLENISH_LEAD_TIME_DAYS
+    safety = settings.REPLENISH_SAFETY_DAYS
+    review = settings.REPLENISH_REVIEW_DAYS
+
+    forecast = inputs["forecast_demand"].astype("float64")
+    velocity = inputs["velocity_28d"].astype("float64")
+    average = inputs["daily_sales_rate"].astype("float64")
+    demand = forecast.fillna(velocity).fillna(average).fillna(0).clip(lower=0)
+    inventory = inputs["current_inventory"].astype("float64")
+
+    out = inputs[["stock_id", "item_nbr", "item_name", "item_category", "current_inventory"]].copy()
+    out["daily_demand"] = demand.round(3)
+    out["demand_source"] = np.select(
+        [forecast.notna(), velocity.notna(), average.notna()], ["forecast", "velocity", "average"], "none"
+    )
+    has_demand = demand > 0
+    out["days_of_cover"] = (inventory.clip(lower=0) / demand.where(has_demand)).round(2)
+    reorder_point = demand * (lead + safety)
+    order_up_to = demand * (lead + review + safety)
+    out["reorder_point"] = reorder_point.round(2)
+    out["order_up_to"] = order_up_to.round(2)
+    out["suggested_order_qty"] = np.where(
+        has_demand & (inventory <= reorder_point), np.ceil((order_up_to - inventory).clip(lower=0)), 0
+    ).astype("int64")
+    out["priority"] = np.select(
+        [has_demand & (inventory <= demand * lead), has_demand & (inventory <= reorder_point)],
+        ["urgent", "medium"],
+        "low"
+    )
+    return out
+
+
+def refresh_replenishment(session: Session, store_nbr: int) -> int:
+    """
+    Recompute the store's replenishment rows in one pass and swap them in (in the
+    caller's transaction). Returns the number of items written.
+    Upload workers and the scheduler refresh the same store: the store's lock, held until
+    commit, makes them swap one after another instead of inserting over each other.
+    """
+    advisory_xact_lock_all(session, "replenishment", [store_nbr])
+    rows = session.execute(_REPLENISHMENT_INPUTS_SQL, {
+        "store_nbr": store_nbr,
+        "start": DEMO_DATE,
+        "end": DEMO_DATE + timedelta(days=FORECAST_HORIZON_DAYS)
+    }).mappings().all()
+
+    session.execute(text("DELETE FROM replenishment WHERE store_nbr = :store_nbr"), {"store_nbr": store_nbr})
+    if not rows:
+        return 0
+
+    metrics = compute_replenishment(pd.DataFrame(rows))
+    metrics["store_nbr"] = store_nbr
+    metrics["updated_at"] = datetime.utcnow()
+    # NaN -> None so psycopg2 binds SQL NULL
+    records = metrics.astype(object).where(metrics.notna(), None).to_dict("records")
+    session.execute(insert(Replenishment), records)
+    return len(records)
+
+
+def refresh_all_replenishment(session: Session) -> int:
+    """Scheduler entry point: refresh every store that has users, so stock changes show up."""
+    # Sorted, so store locks are always taken in the same order
+    store_nbrs = session.exec(select(User.store_nbr).distinct().order_by(User.store_nbr)).all()
+    return sum(refresh_replenishment(session, store_nbr) for store_nbr in store_nbrs)
+
+
+def list_recommendations(
+    session: Session,
+    store_nbr: int,
+    sort: str = "days_of_cover",
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    reorder_only: bool = False,
+    limit: int = 100,
+    offset: int = 0
+) -> dict:
+    """One page of the store's replenishment rows, filtered and sorted in SQL."""
+    conditions = [Replenishment.store_nbr == store_nbr]
+    if priority is not None:
+        conditions.append(Replenishment.priority == priority)
+    if category is not None:
+        conditions.append(Replenishment.item_category == category)
+    if reorder_only:
+        conditions.append(Replenishment.suggested_order_qty > 0)
+
+    items = session.exec(
+        select(Replenishment)
+        .where(*conditions)
+        .order_by(RECOMMENDATION_SORTS[sort], Replenishment.item_nbr)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    total, updated_at = session.execute(
+        select(func.count(), func.max(Replenishment.updated_at)).where(*conditions)
+    ).one()
+    return {"items": items, "total": total, "updated_at": updated_at}
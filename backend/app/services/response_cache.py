@@ -0,0 +1,156 @@
+# backend/app/services/response_cache.py
+
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import User
+
+
+# Bump one store, or every store that has users, a version row or rolled-up sales
+# (a full rebuild changes all of them); runs in the caller's transaction
+_BUMP_STORE_SQL = text("""
+    INSERT INTO dataversion (store_nbr, version) VALUES (:store_nbr, 1)
+    ON CONFLICT (store_nbr) DO UPDATE SET version = dataversion.version + 1
+""")
+_BUMP_ALL_SQL = text("""
+    INSERT INTO dataversion (store_nbr, version)
+    SELECT store_nbr, 1 FROM (
+        SELECT store_nbr FROM "user"
+        UNION SELECT store_nbr FROM dataversion
+        UNION SELECT DISTINCT store_nbr FROM salesdaily
+    ) stores
+    ON CONFLICT (store_nbr) DO UPDATE SET version = dataversion.version + 1
+""")
+# A store's version; all-store entries use the sum, which moves with any store's bump
+_STORE_VERSION_SQL = text("SELECT COALESCE(MAX(version), 0) FROM dataversion WHERE store_nbr = :store_nbr")
+_ALL_VERSION_SQL = text("SELECT COALESCE(SUM(version), 0) FROM dataversion")
+
+
+class ResponseCache:
+    """
+    In-process LRU cache for analytics responses, bounded by entry age (TTL) and by the
+    approximate JSON size of all entries. Every entry remembers the data version it was
+    computed at and is only served while that version is current. Versions live in the
+    dataversion table and are bumped in the transactions that change the data, so an
+    upload handled by one worker makes the entries of every worker stale at its commit.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, version, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def data_version(self, session: Session, store_nbr: Optional[int] = None) -> int:
+        if store_nbr is None:
+            return session.execute(_ALL_VERSION_SQL).scalar()
+        return session.execute(_STORE_VERSION_SQL, {"store_nbr": store_nbr}).scalar()
+
+    def bump_data_version(self, session: Session, store_nbr: Optional[int] = None):
+        """
+        Call in the transaction that changes a store's Sales/Forecast data (every store's
+        when None), before it commits. The version row stays locked until then.
+        """
+        if store_nbr is None:
+            session.execute(_BUMP_ALL_SQL)
+        else:
+            session.execute(_BUMP_STORE_SQL, {"store_nbr": store_nbr})
+
+    def get_or_compute(
+        self,
+        key: tuple,
+        compute: Callable[[], Any],
+        session: Session,
+        store_nbr: Optional[int] = None
+    ) -> Any:
+        # Read the version before computing: data committed meanwhile leaves the entry stale
+        version = self.data_version(session, store_nbr)
+        key = (*key, store_nbr)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_version, expires_at, _ = entry
+                if entry_version == version and now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._evict(key)
+            self.misses += 1
+
+        value = compute()
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (value, version, now + self.ttl_seconds, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return value
+
+    def _evict(self, key: tuple):
+        self._bytes -= self._entries.pop(key)[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+response_cache = ResponseCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024
+)
+
+
+def cached_response(name: str, user_param: Optional[str] = None):
+    """
+    Cache a GET endpoint's result by name and query parameters. Session arguments are
+    left out of the key, and on a hit the endpoint body (and its queries) never runs.
+    Entries follow the data version of the store of the user named by user_param when
+    the request has one, and of all stores otherwise.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            session = next(value for value in kwargs.values() if isinstance(value, Session))
+            params = tuple(sorted(
+                (param, str(value)) for param, value in kwargs.items() if not isinstance(value, Session)
+            ))
+            store_nbr = None
+            user_id = kwargs.get(user_param) if user_param else None
+            if user_id:
+                user = session.get(User, user_id)
+                store_nbr = user.store_nbr if user is not None else None
+            return response_cache.get_or_compute(
+                (name, params), lambda: endpoint(*args, **kwargs), session, store_nbr
+            )
+        return wrapper
+    return decorator
@@ -1,6 +1,69 @@
+from datetime import date, timedelta
 from sqlmodel import Session, select, func
-from typing import List, Dict, Optional
-from ..models import Sales, Product
+from sqlalchemy import text
+from typing import Iterable, List, Dict, Optional, Tuple
+from ..database import advisory_xact_lock_all
+from ..models import Sales, Product, SalesDaily
+from .response_cache import response_cache
+
+# Re-aggregate the given (store_nbr, date) days from sales into the rollup: upsert the
+# current per-category totals and drop categories that no longer have rows on those days.
+# {days} selects the days: the bound arrays, or every day of sales for a full rebuild
+_REFRESH_SALES_DAILY_SQL = """
+    WITH days AS (
+        {days}
+    ), totals AS (
+        SELECT s.store_nbr, s.date, NULLIF(s.category, '') AS category,
+            SUM(s.unit_sales * s.price) AS revenue,
+            SUM(s.unit_sales) AS units,
+            SUM((s.price - s.cost_price) * s.unit_sales) AS profit,
+            COUNT(*) AS row_count
+        FROM sales s
+        JOIN days d ON d.store_nbr = s.store_nbr AND d.date = s.date
+        GROUP BY s.store_nbr, s.date, NULLIF(s.category, '')
+    ), upserted AS (
+        INSERT INTO salesdaily (store_nbr, date, category, revenue, units, profit, row_count)
+        SELECT * FROM totals
+        ON CONFLICT (store_nbr, date, (COALESCE(category, ''))) DO UPDATE SET
+            revenue = EXCLUDED.revenue,
+            units = EXCLUDED.units,
+            profit = EXCLUDED.profit,
+            row_count = EXCLUDED.row_count
+    )
+    DELETE FROM salesdaily r
+    USING days d
+    WHERE r.store_nbr = d.store_nbr AND r.date = d.date
+        AND NOT EXISTS (
+            SELECT 1 FROM totals t
+            WHERE t.store_nbr = r.store_nbr AND t.date = r.date AND t.category IS NOT DISTINCT FROM r.category
+        )
+"""
+_CHANGED_DAYS_SQL = """
+    SELECT * FROM unnest(CAST(:store_nbrs AS integer[]), CAST(:dates AS date[])) AS d(store_nbr, date)
+"""
+_ALL_DAYS_SQL = "SELECT DISTINCT store_nbr, date FROM sales"
+
+
+def refresh_sales_daily(session: Session, days: Optional[Iterable[Tuple[int, date]]] = None):
+    """
+    Bring the rollup up to date for the given (store_nbr, date) days (all of them when None).
+    Runs in the caller's transaction, so it commits together with the Sales writes.
+    The stores' locks are held until then, so concurrent uploads re-aggregate a day one
+    after another, each reading the Sales rows the previous one committed.
+    """
+    if days is None:
+        advisory_xact_lock_all(session, "salesdaily")
+        session.execute(text(_REFRESH_SALES_DAILY_SQL.format(days=_ALL_DAYS_SQL)))
+        # Uploads bump their own store; a full rebuild may change any store's rollup
+        response_cache.bump_data_version(session)
+        return
+    days = sorted(set(days))
+    if days:
+        advisory_xact_lock_all(session, "salesdaily", {store_nbr for store_nbr, _ in days})
+        session.execute(text(_REFRESH_SALES_DAILY_SQL.format(days=_CHANGED_DAYS_SQL)), {
+            "store_nbrs": [store_nbr for store_nbr, _ in days],
+            "dates": [day for _, day in days]
+        })
 
 def get_past_sales(
     db: Session, 
@@ -23,14 +86,14 @@ def get_daily_total_sales(
     limit: int = 30
 ) -> List[Dict]:
     query = select(
-        Sales.date,
-        func.sum(Sales.unit_sales * Sales.price).label("total_revenue")
+        SalesDaily.date,
+        func.sum(SalesDaily.revenue).label("total_revenue")
     )
     if start_date:
-        query = query.where(Sales.date >= start_date)
+        query = query.where(SalesDaily.date >= start_date)
     if end_date:
-        query = query.where(Sales.date <= end_date)
-    query = query.group_by(Sales.date).order_by(Sales.date.desc()).limit(limit)
+        query = query.where(SalesDaily.date <= end_date)
+    query = query.group_by(SalesDaily.date).order_by(SalesDaily.date.desc()).limit(limit)
     result = db.exec(query).all()
     # Result similar to [(date, total_revenue), ...]
     # Returns List[dict]
@@ -44,15 +107,15 @@ def get_daily_category_sales(
     limit: int = 30
 ) -> List[Dict]:
     query = select(
-        Sales.date,
-        Sales.category,
-        func.sum(Sales.unit_sales * Sales.price).label("total_revenue")
+        SalesDaily.date,
+        SalesDaily.category,
+        func.sum(SalesDaily.revenue).label("total_revenue")
     )
     if start_date:
-        query = query.where(Sales.date >= start_date)
+        query = query.where(SalesDaily.date >= start_date)
     if end_date:
-        query = query.where(Sales.date <= end_date)
-    query = query.group_by(Sales.date, Sales.category).order_by(Sales.date.desc()).limit(limit * 5)
+        query = query.where(SalesDaily.date <= end_date)
+    query = query.group_by(SalesDaily.date, SalesDaily.category).order_by(SalesDaily.date.desc()).limit(limit * 5)
     # limit * 5 is to leave more space for multiple categories each day.
     result = db.exec(query).all()
     return [
@@ -67,14 +130,14 @@ def get_daily_total_unit_sales(
     limit: int = 30
 ) -> List[Dict]:
     query = select(
-        Sales.date,
-        func.sum(Sales.unit_sales).label("total_unit_sales")
+        SalesDaily.date,
+        func.sum(SalesDaily.units).label("total_unit_sales")
     )
     if start_date:
-        query = query.where(Sales.date >= start_date)
+        query = query.where(SalesDaily.date >= start_date)
     if end_date:
-        query = query.where(Sales.date <= end_date)
-    query = query.group_by(Sales.date).order_by(Sales.date.desc()).limit(limit)
+        query = query.where(SalesDaily.date <= end_date)
+    query = query.group_by(SalesDaily.date).order_by(SalesDaily.date.desc()).limit(limit)
     result = db.exec(query).all()
     return [{"date": str(row[0]), "unit_sales": float(row[1] or 0)} for row in result]
 
@@ -128,14 +191,14 @@ def get_daily_total_profit(
     limit: int = 30
 ) -> List[Dict]:
     query = select(
-        Sales.date,
-        func.sum((Sales.price - Sales.cost_price) * Sales.unit_sales).label("total_profit")
+        SalesDaily.date,
+        func.sum(SalesDaily.profit).label("total_profit")
     )
     if start_date:
-        query = query.where(Sales.date >= start_date)
+        query = query.where(SalesDaily.date >= start_date)
     if end_date:
-        query = query.where(Sales.date <= end_date)
-    query = query.group_by(Sales.date).order_by(Sales.date.desc()).limit(limit)
+        query = query.where(SalesDaily.date <= end_date)
+    query = query.group_by(SalesDaily.date).order_by(SalesDaily.date.desc()).limit(limit)
     result = db.exec(query).all()
     return [{"date": str(row[0]), "profit": float(row[1] or 0)} for row in result]
 
@@ -172,3 +235,113 @@ def get_bottom_items_sold(
         }
         for row in result
     ]
+
+# Top and bottom sellers ranked from one aggregation: {totals} yields (item_nbr, total_sold),
+# either from the per-item aggregate (all history) or from sales within a date window.
+# Names and categories come from any store's Product row of the item.
+_RANKED_ITEMS_SQL = """
+    WITH totals AS (
+        {totals}
+    ), ranked AS (
+        SELECT t.item_nbr, p.item_name, p.item_category AS category, t.total_sold,
+            row_number() OVER (ORDER BY t.total_sold DESC, t.item_nbr) AS top_rank,
+            row_number() OVER (ORDER BY t.total_sold ASC, t.item_nbr) AS bottom_rank
+        FROM totals t
+        JOIN LATERAL (
+            SELECT item_name, item_category FROM product
+            WHERE product.item_nbr = t.item_nbr
+            ORDER BY store_nbr
+            LIMIT 1
+        ) p ON true
+    )
+    SELECT * FROM ranked WHERE top_rank <= :top_limit OR bottom_rank <= :top_limit
+"""
+_ALL_TIME_ITEM_TOTALS_SQL = "SELECT item_nbr, total_units AS total_sold FROM itemsalesstats"
+_WINDOW_ITEM_TOTALS_SQL = """
+    SELECT item_nbr, SUM(unit_sales) AS total_sold FROM sales
+    WHERE date BETWEEN :items_start AND :items_end
+    GROUP BY item_nbr
+"""
+
+
+def get_sales_dashboard(
+    db: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 30,
+    top_limit: int = 5,
+    item_days: Optional[int] = None
+) -> Dict:
+    """
+    Every dashboard sales series in one call: daily revenue, category revenue, units and
+    profit for the latest `limit` days in range (one grouped read of the rollup), plus top
+    and bottom sellers (one ranked aggregation) and the latest sales date.
+    Sellers cover the same date range, narrowed to the last `item_days` days when given;
+    with no range at all they cover all history.
+    """
+    latest = db.exec(select(func.max(SalesDaily.date))).one()
+
+    conditions = []
+    if start_date:
+        conditions.append(SalesDaily.date >= start_date)
+    if end_date:
+        conditions.append(SalesDaily.date <= end_date)
+    days = (
+        select(SalesDaily.date).where(*conditions)
+        .distinct().order_by(SalesDaily.date.desc()).limit(limit)
+    )
+    rows = db.exec(
+        select(
+            SalesDaily.date,
+            SalesDaily.category,
+            func.sum(SalesDaily.revenue),
+            func.sum(SalesDaily.units),
+            func.sum(SalesDaily.profit)
+        )
+        .where(SalesDaily.date.in_(days))
+        .group_by(SalesDaily.date, SalesDaily.category)
+        .order_by(SalesDaily.date.desc())
+    ).all()
+
+    # Per-day totals are the sums of the day's category rows
+    daily = {}
+    category_revenue = []
+    for day, category, revenue, units, profit in rows:
+        totals = daily.setdefault(str(day), {"revenue": 0.0, "unit_sales": 0.0, "profit": 0.0})
+        totals["revenue"] += float(revenue or 0)
+        totals["unit_sales"] += float(units or 0)
+        totals["profit"] += float(profit or 0)
+        category_revenue.append({"date": str(day), "category": category, "revenue": float(revenue or 0)})
+
+    items_start, items_end = start_date, end_date
+    if item_days and latest is not None:
+        items_end = end_date or str(latest)
+        window_start = str(date.fromisoformat(items_end) - timedelta(days=item_days - 1))
+        items_start = max(start_date, window_start) if start_date else window_start
+    if items_start or items_end:
+        item_sql = _RANKED_ITEMS_SQL.format(totals=_WINDOW_ITEM_TOTALS_SQL)
+        params = {"items_start": items_start or date.min, "items_end": items_end or date.max}
+    else:
+        item_sql = _RANKED_ITEMS_SQL.format(totals=_ALL_TIME_ITEM_TOTALS_SQL)
+        params = {}
+    items = db.execute(text(item_sql), {**params, "top_limit": top_limit}).mappings().all()
+
+    def _item(row):
+        return {
+            "item_nbr": row["item_nbr"],
+            "item_name": row["item_name"],
+            "category": row["category"],
+            "total_sold": int(row["total_sold"] or 0)
+        }
+
+    return {
+        "latest_date": str(latest) if latest else None,
+        "daily_revenue": [{"date": day, "revenue": t["revenue"]} for day, t in daily.items()],
+        "daily_category_revenue": category_revenue,
+        "daily_unit_sales": [{"date": day, "unit_sales": t["unit_sales"]} for day, t in daily.items()],
+        "daily_profit": [{"date": day, "profit": t["profit"]} for day, t in daily.items()],
+        "top_items": [_item(row) for row in sorted(items, key=lambda r: r["top_rank"]) if row["top_rank"] <= top_limit],
+        "bottom_items": [
+            _item(row) for row in sorted(items, key=lambda r: r["bottom_rank"]) if row["bottom_rank"] <= top_limit
+        ]
+    }
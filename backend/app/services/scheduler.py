@@ -0,0 +1,134 @@
+# backend/app/services/scheduler.py
+
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlmodel import Session, select, func
+
+from app.core.config import settings
+from app.database import engine, try_advisory_xact_lock
+from app.models import InventoryMovement, ScheduledJobRun, Stock
+from app.services.replenishment import refresh_all_replenishment
+from app.services.sales import refresh_sales_daily
+from app.services.stock import (
+    compact_inventory_movements, populate_stock_from_product, refresh_item_sales_stats, refresh_sales_velocity
+)
+
+# How often the scheduler thread checks for due jobs
+TICK_SECONDS = 30
+
+# Interval of one-off jobs (backfills of new tables): once recorded, a run never becomes due again
+ONCE = timedelta(days=365 * 100)
+
+
+class ScheduledJob:
+    """
+    A periodic maintenance job. Every process runs the scheduler, but a run only
+    happens under the job's advisory lock and only if no other process has run the
+    job within its interval (last_run reads that from the database; by default the
+    job's ScheduledJobRun row). Jobs are first checked right after the scheduler starts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: timedelta,
+        run: Callable[[Session], object],
+        last_run: Optional[Callable[[Session], Optional[datetime]]] = None
+    ):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.last_run = last_run or self._recorded_last_run
+        self.next_check = datetime.utcnow()
+
+    def _recorded_last_run(self, session: Session) -> Optional[datetime]:
+        record = session.get(ScheduledJobRun, self.name)
+        return record.finished_at if record else None
+
+    def run_if_due(self):
+        now = datetime.utcnow()
+        if now < self.next_check:
+            return
+        self.next_check = now + self.interval
+
+        with Session(engine) as session:
+            if not try_advisory_xact_lock(session, f"scheduler:{self.name}"):
+                return  # another worker is running it right now
+            last_run = self.last_run(session)
+            if last_run is not None and now - last_run < self.interval:
+                self.next_check = last_run + self.interval
+                return
+            started = datetime.utcnow()
+            result = self.run(session)
+            # Recorded before commit releases the lock, so the next worker sees this run
+            session.merge(ScheduledJobRun(name=self.name, finished_at=datetime.utcnow()))
+            session.commit()
+            print(f"⏱️ [scheduler] {self.name}: {result} in {(datetime.utcnow() - started).total_seconds():.2f}s")
+
+
+def _velocity_last_run(session: Session) -> Optional[datetime]:
+    return session.exec(select(func.max(Stock.velocity_updated_at))).one()
+
+
+def _compaction_last_run(session: Session) -> Optional[datetime]:
+    return session.exec(select(func.max(InventoryMovement.compacted_at))).one()
+
+
+JOBS = [
+    # Full rebuilds of the per-item sales stats and the sales rollup, for databases that had
+    # sales before those tables existed; uploads keep them up to date afterwards
+    ScheduledJob("item_sales_stats_backfill", ONCE, refresh_item_sales_stats),
+    ScheduledJob("sales_daily_backfill", ONCE, refresh_sales_daily),
+    ScheduledJob(
+        "stock_population",
+        timedelta(minutes=settings.STOCK_POPULATE_MINUTES),
+        populate_stock_from_product
+    ),
+    ScheduledJob(
+        "sales_velocity",
+        timedelta(minutes=settings.VELOCITY_REFRESH_MINUTES),
+        refresh_sales_velocity,
+        _velocity_last_run
+    ),
+    ScheduledJob(
+        "inventory_compaction",
+        timedelta(seconds=settings.INVENTORY_COMPACT_SECONDS),
+        compact_inventory_movements,
+        _compaction_last_run
+    ),
+    ScheduledJob(
+        "replenishment",
+        timedelta(minutes=settings.REPLENISHMENT_REFRESH_MINUTES),
+        refresh_all_replenishment
+    ),
+]
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _loop():
+    while True:
+        for job in JOBS:
+            try:
+                job.run_if_due()
+            except Exception:
+                traceback.print_exc()
+        if _stop.wait(TICK_SECONDS):
+            return
+
+
+def start_scheduler():
+    global _thread
+    if not settings.SCHEDULER_ENABLED or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="scheduler", daemon=True)
+    _thread.start()
+
+
+def stop_scheduler():
+    _stop.set()
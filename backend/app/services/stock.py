@@ -1,90 +1,366 @@
 # backend/app/services/stock.py
 
-from sqlmodel import Session, select
-from app.models import Product, Stock  # adjust if your models are elsewhere
-from sqlmodel import Session, select, func
-from app.models import Sales, Stock
-from app.database import engine
-
-from sqlmodel import Session, select
-from app.models import Product, Stock, Sales
-
-def populate_stock_from_product(session: Session):
-    products = session.exec(select(Product)).all()
-    print(f"✅ [populate_stock] Products retrieved: {len(products)}")
-
-    inserted = 0
-    for p in products:
-        print(f"➡️ Processing item_nbr={p.item_nbr}, date={p.date}, inventory={p.item_inventory}")
-
-        existing = session.exec(
-            select(Stock)
-            .where(Stock.item_nbr == p.item_nbr)
-            .where(Stock.date == p.date)
-        ).first()
-
-        if existing:
-            print(f"⚠️ Already exists: item_nbr={p.item_nbr} on {p.date}")
-            continue
-
-        # ✅ Calculate daily sales rate
-        sales_data = session.exec(
-            select(Sales.unit_sales, Sales.date).where(Sales.item_nbr == p.item_nbr)
-        ).all()
-
-        if sales_data:
-            total_units_sold = sum([s.unit_sales or 0 for s in sales_data])
-            unique_dates = set([s.date for s in sales_data])
-            avg_daily_sales = total_units_sold / len(unique_dates) if unique_dates else 0
-        else:
-            avg_daily_sales = 0
-
-        stock = Stock(
-            item_nbr=p.item_nbr,
-            item_name=p.item_name,
-            item_category=p.item_category,
-            item_inventory=p.item_inventory,
-            date=p.date,
-            daily_sales_rate=round(avg_daily_sales, 1)  # ✅ Rounded to 1 decimal place
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlmodel import Session, func, select
+
+from app.database import advisory_xact_lock_all, engine
+from app.models import InventoryMovement, Stock
+
+# One Stock row per (item_nbr, date) of Product that is not in stock yet, with the item's
+# average daily sales (total units over distinct sale days, all stores) rounded to 1 decimal,
+# read from the per-item aggregate instead of the sales history.
+_POPULATE_STOCK_SQL = text("""
+    WITH missing AS (
+        SELECT DISTINCT ON (p.item_nbr, p.date)
+            p.item_nbr, p.item_name, p.item_category, p.item_inventory, p.date
+        FROM product p
+        WHERE NOT EXISTS (
+            SELECT 1 FROM stock s WHERE s.item_nbr = p.item_nbr AND s.date = p.date
         )
-        session.add(stock)
-        inserted += 1
+        ORDER BY p.item_nbr, p.date, p.id
+    )
+    INSERT INTO stock (item_nbr, item_name, item_category, item_inventory, date, created_at, daily_sales_rate)
+    SELECT
+        m.item_nbr, m.item_name, m.item_category, m.item_inventory, m.date,
+        now() AT TIME ZONE 'utc',
+        round(COALESCE(st.total_units / NULLIF(st.sales_days, 0), 0)::numeric, 1)
+    FROM missing m
+    LEFT JOIN itemsalesstats st ON st.item_nbr = m.item_nbr
+    ON CONFLICT (item_nbr, date) DO NOTHING
+""")
 
-    session.commit()
+# Recompute total units / distinct sale days of the given items (all stores) through
+# the (item_nbr, date) index; {where} is empty for a full rebuild
+_REFRESH_SALES_STATS_SQL = """
+    INSERT INTO itemsalesstats (item_nbr, total_units, sales_days, updated_at)
+    SELECT item_nbr, COALESCE(SUM(unit_sales), 0), COUNT(DISTINCT date), now() AT TIME ZONE 'utc'
+    FROM sales
+    {where}
+    GROUP BY item_nbr
+    ON CONFLICT (item_nbr) DO UPDATE SET
+        total_units = EXCLUDED.total_units,
+        sales_days = EXCLUDED.sales_days,
+        updated_at = EXCLUDED.updated_at
+"""
+
+_REFRESH_DAILY_SALES_RATE_SQL = """
+    UPDATE stock s
+    SET daily_sales_rate = st.total_units / st.sales_days
+    FROM itemsalesstats st
+    WHERE st.item_nbr = s.item_nbr AND st.sales_days > 0
+    {where}
+"""
+
+
+def populate_stock_from_product(session: Session) -> int:
+    """Insert the missing Stock rows in the caller's transaction. Returns the number inserted."""
+    inserted = session.execute(_POPULATE_STOCK_SQL).rowcount
     print(f"✅ [populate_stock] Inserted into stock: {inserted} rows")
+    return inserted
+
+
+def refresh_item_sales_stats(session: Session, item_nbrs: Optional[Iterable[int]] = None):
+    """
+    Bring the per-item sales aggregate up to date for item_nbrs (all items when None).
+    Runs in the caller's transaction, so it commits together with the Sales writes.
+    The items' locks are held until then: a concurrent upload of the same items waits, and
+    its recompute reads our Sales rows instead of overwriting the totals with a snapshot
+    that misses them. Callers that touch Sales days too must lock items first.
+    """
+    if item_nbrs is None:
+        advisory_xact_lock_all(session, "itemsalesstats")
+        session.execute(text(_REFRESH_SALES_STATS_SQL.format(where="")))
+        return
+    item_nbrs = sorted(set(item_nbrs))
+    if item_nbrs:
+        advisory_xact_lock_all(session, "itemsalesstats", item_nbrs)
+        session.execute(
+            text(_REFRESH_SALES_STATS_SQL.format(where="WHERE item_nbr = ANY(:item_nbrs)")),
+            {"item_nbrs": item_nbrs}
+        )
+
+
+def refresh_daily_sales_rate(session: Session, item_nbrs: Optional[Iterable[int]] = None):
+    """Copy total units / sales days from the aggregate into Stock for item_nbrs (all when None)."""
+    if item_nbrs is None:
+        session.execute(text(_REFRESH_DAILY_SALES_RATE_SQL.format(where="")))
+        return
+    item_nbrs = sorted(set(item_nbrs))
+    if item_nbrs:
+        session.execute(
+            text(_REFRESH_DAILY_SALES_RATE_SQL.format(where="AND s.item_nbr = ANY(:item_nbrs)")),
+            {"item_nbrs": item_nbrs}
+        )
 
 
 def update_daily_sales_rate():
+    """Full rebuild of the sales aggregate and every Stock daily_sales_rate (manual repair)."""
     with Session(engine) as session:
-        # Get all item_nbrs from stock
-        item_nbrs = session.exec(select(Stock.item_nbr)).all()
+        refresh_item_sales_stats(session)
+        refresh_daily_sales_rate(session)
+        session.commit()
 
-        for item_nbr in item_nbrs:
-            # Fetch all sales for that item_nbr
-            sales_data = session.exec(
-                select(Sales.unit_sales, Sales.date).where(Sales.item_nbr == item_nbr)
-            ).all()
 
-            if not sales_data:
-                continue
+# 7/28/90-day sales velocity (units per calendar day, all stores) for every Stock item,
+# anchored at the latest sales date. One scan of the last 90 days of sales through the
+# date-leading unique index; items without sales in a window get 0.
+_REFRESH_VELOCITY_SQL = text("""
+    WITH anchor AS (
+        SELECT max(date) AS day FROM sales
+    ), velocity AS (
+        SELECT
+            item_nbr,
+            COALESCE(SUM(unit_sales) FILTER (WHERE date > anchor.day - 7), 0) / 7.0 AS v7,
+            COALESCE(SUM(unit_sales) FILTER (WHERE date > anchor.day - 28), 0) / 28.0 AS v28,
+            COALESCE(SUM(unit_sales), 0) / 90.0 AS v90
+        FROM sales, anchor
+        WHERE date > anchor.day - 90
+        GROUP BY item_nbr
+    )
+    UPDATE stock s SET
+        velocity_7d = COALESCE(v.v7, 0),
+        velocity_28d = COALESCE(v.v28, 0),
+        velocity_90d = COALESCE(v.v90, 0),
+        velocity_updated_at = now() AT TIME ZONE 'utc'
+    FROM stock s2
+    LEFT JOIN velocity v ON v.item_nbr = s2.item_nbr
+    WHERE s2.id = s.id
+""")
 
-            total_units_sold = sum([s.unit_sales or 0 for s in sales_data])
-            unique_dates = set([s.date for s in sales_data])
 
-            if not unique_dates:
-                continue
+def refresh_sales_velocity(session: Session) -> int:
+    """Recompute the velocity columns of all Stock rows. Returns the number of rows updated."""
+    return session.execute(_REFRESH_VELOCITY_SQL).rowcount
 
-            avg_daily_sales = total_units_sold / len(unique_dates)
 
-            # Update corresponding stock row(s)
-            stock_rows = session.exec(select(Stock).where(Stock.item_nbr == item_nbr)).all()
-            for stock in stock_rows:
-                stock.daily_sales_rate = avg_daily_sales
-                session.add(stock)
+# Resolve a batch of inventory deltas to Stock rows and lock them. Each entry targets a
+# Stock id, or an item_nbr meaning that item's latest-dated row; deltas hitting the same
+# row are summed. Rows are locked in id order, so overlapping batches wait for each other
+# instead of deadlocking.
+_LOCK_STOCK_TARGETS_SQL = text("""
+    WITH v AS (
+        SELECT * FROM unnest(
+            CAST(:stock_ids AS integer[]), CAST(:item_nbrs AS integer[]), CAST(:deltas AS integer[])
+        ) AS v(stock_id, item_nbr, delta)
+    ), target AS (
+        SELECT COALESCE(v.stock_id, latest.id) AS id, SUM(v.delta) AS delta
+        FROM v
+        LEFT JOIN LATERAL (
+            SELECT s.id FROM stock s
+            WHERE v.stock_id IS NULL AND s.item_nbr = v.item_nbr
+            ORDER BY s.date DESC, s.id DESC
+            LIMIT 1
+        ) latest ON true
+        GROUP BY 1
+    )
+    SELECT s.id, target.delta
+    FROM stock s
+    JOIN target ON target.id = s.id
+    ORDER BY s.id
+    FOR UPDATE OF s
+""")
 
-        session.commit()
+# Apply the locked rows' deltas in one statement; the increment happens in SQL so
+# concurrent receipts cannot overwrite each other.
+_ADJUST_STOCK_SQL = text("""
+    UPDATE stock s
+    SET item_inventory = s.item_inventory + v.delta
+    FROM unnest(CAST(:ids AS integer[]), CAST(:deltas AS integer[])) AS v(id, delta)
+    WHERE s.id = v.id
+    RETURNING s.id, s.item_nbr, s.item_name, s.item_category, s.date,
+        s.item_inventory + COALESCE((
+            SELECT SUM(m.delta) FROM inventorymovement m
+            WHERE m.stock_id = s.id AND m.compacted_at IS NULL
+        ), 0) AS item_inventory
+""")
+
+# Append movements to the ledger, resolving targets like _LOCK_STOCK_TARGETS_SQL. Stock is only
+# read (no row lock), so concurrent events for the same item never wait on each other.
+_RECORD_MOVEMENTS_SQL = text("""
+    WITH v AS (
+        SELECT * FROM unnest(
+            CAST(:stock_ids AS integer[]), CAST(:item_nbrs AS integer[]),
+            CAST(:kinds AS varchar[]), CAST(:deltas AS integer[])
+        ) AS v(stock_id, item_nbr, kind, delta)
+    ), target AS (
+        SELECT s.id, s.item_nbr, v.kind, v.delta
+        FROM v
+        LEFT JOIN LATERAL (
+            SELECT l.id FROM stock l
+            WHERE v.stock_id IS NULL AND l.item_nbr = v.item_nbr
+            ORDER BY l.date DESC, l.id DESC
+            LIMIT 1
+        ) latest ON true
+        JOIN stock s ON s.id = COALESCE(v.stock_id, latest.id)
+    ), inserted AS (
+        INSERT INTO inventorymovement (stock_id, kind, delta, created_at)
+        SELECT id, kind, delta, now() AT TIME ZONE 'utc' FROM target
+    )
+    SELECT id, item_nbr FROM target
+""")
+
+# Fold every pending movement into its Stock snapshot and mark it compacted, in one
+# statement: a reader sees each movement either pending or in the snapshot, never both.
+# Movements inserted while it runs stay pending for the next pass.
+_COMPACT_MOVEMENTS_SQL = text("""
+    WITH moved AS (
+        UPDATE inventorymovement
+        SET compacted_at = now() AT TIME ZONE 'utc'
+        WHERE compacted_at IS NULL
+        RETURNING stock_id, delta
+    ), totals AS (
+        SELECT stock_id, SUM(delta) AS delta FROM moved GROUP BY stock_id
+    )
+    UPDATE stock s
+    SET item_inventory = s.item_inventory + totals.delta
+    FROM totals
+    WHERE s.id = totals.stock_id
+""")
+
+
+def _missing_targets(requested: list[dict], found: list[dict]) -> list[str]:
+    """Describe the {stock_id | item_nbr} targets of requested that matched no Stock row."""
+    found_ids = {row["id"] for row in found}
+    found_items = {row["item_nbr"] for row in found}
+    return sorted(
+        {f"stock_id={r['stock_id']}" for r in requested
+         if r.get("stock_id") is not None and r["stock_id"] not in found_ids}
+        | {f"item_nbr={r['item_nbr']}" for r in requested
+           if r.get("stock_id") is None and r["item_nbr"] not in found_items}
+    )
 
 
+def adjust_stock(session: Session, adjustments: list[dict]) -> list[dict]:
+    """
+    Apply {stock_id | item_nbr, delta} adjustments atomically and return the new levels.
+    If any target does not exist nothing is written and a LookupError names the missing ones.
+    """
+    targets = session.execute(_LOCK_STOCK_TARGETS_SQL, {
+        "stock_ids": [a.get("stock_id") for a in adjustments],
+        "item_nbrs": [a.get("item_nbr") for a in adjustments],
+        "deltas": [a["delta"] for a in adjustments]
+    }).all()
+    rows = session.execute(_ADJUST_STOCK_SQL, {
+        "ids": [row.id for row in targets],
+        "deltas": [row.delta for row in targets]
+    }).all()
+    updated = [dict(row._mapping) for row in rows]
+
+    missing = _missing_targets(adjustments, updated)
+    if missing:
+        session.rollback()
+        raise LookupError(f"Stock items not found: {', '.join(missing)}")
+
+    session.commit()
+    return updated
+
+
+def record_inventory_movements(session: Session, movements: list[dict]) -> int:
+    """
+    Append {stock_id | item_nbr, kind, delta} events to the ledger without touching Stock.
+    All or nothing: if any target does not exist nothing is recorded.
+    """
+    rows = session.execute(_RECORD_MOVEMENTS_SQL, {
+        "stock_ids": [m.get("stock_id") for m in movements],
+        "item_nbrs": [m.get("item_nbr") for m in movements],
+        "kinds": [m["kind"] for m in movements],
+        "deltas": [m["delta"] for m in movements]
+    }).all()
+
+    missing = _missing_targets(movements, [dict(row._mapping) for row in rows])
+    if missing:
+        session.rollback()
+        raise LookupError(f"Stock items not found: {', '.join(missing)}")
+
+    session.commit()
+    return len(rows)
+
+
+def compact_inventory_movements(session: Session) -> int:
+    """Fold pending movements into Stock.item_inventory. Returns the number of Stock rows changed."""
+    return session.execute(_COMPACT_MOVEMENTS_SQL).rowcount
+
+
+# Stock level as readers see it: the compacted snapshot plus the pending movements
+_pending_delta = (
+    select(func.coalesce(func.sum(InventoryMovement.delta), 0))
+    .where(InventoryMovement.stock_id == Stock.id, InventoryMovement.compacted_at.is_(None))
+    .scalar_subquery()
+)
+current_inventory = Stock.item_inventory + _pending_delta
+
+
+STOCK_FIELDS = set(Stock.__table__.columns.keys())
+
+
+def list_stock(
+    session: Session,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    category: Optional[str] = None,
+    max_inventory: Optional[int] = None,
+    max_days_left: Optional[float] = None,
+    fields: Optional[list[str]] = None
+) -> dict:
+    """
+    One keyset page of Stock rows (ordered by id), filtered and projected in SQL;
+    item_inventory includes movements the compactor has not folded in yet.
+    The total is only computed for the first page: an exact count when filtered,
+    otherwise the planner's row estimate for the table.
+    """
+    columns = [
+        current_inventory.label(field) if field == "item_inventory" else Stock.__table__.c[field]
+        for field in (fields or sorted(STOCK_FIELDS))
+    ]
+    if "id" not in (fields or STOCK_FIELDS):
+        columns.insert(0, Stock.__table__.c.id)  # needed for the next page's cursor
+
+    conditions = []
+    if category is not None:
+        conditions.append(Stock.item_category == category)
+    if max_inventory is not None:
+        conditions.append(current_inventory <= max_inventory)
+    if max_days_left is not None:
+        # Days of cover at the recent velocity (lifetime average until it is computed)
+        rate = func.coalesce(Stock.velocity_28d, Stock.daily_sales_rate)
+        conditions.append(rate > 0)
+        conditions.append(current_inventory / rate <= max_days_left)
+
+    stmt = select(*columns).where(*conditions)
+    if after_id is not None:
+        stmt = stmt.where(Stock.id > after_id)
+    rows = session.execute(stmt.order_by(Stock.id).limit(limit)).all()
+    items = [dict(row._mapping) for row in rows]
+
+    total = None
+    total_is_estimate = False
+    if after_id is None:
+        if conditions:
+            total = session.exec(select(func.count()).select_from(Stock).where(*conditions)).one()
+        else:
+            estimate = session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'stock'::regclass")
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                total, total_is_estimate = estimate, True
+            else:  # never analyzed yet
+                total = session.exec(select(func.count()).select_from(Stock)).one()
 
+    return {
+        "items": items,
+        "next_after_id": items[-1]["id"] if len(items) == limit else None,
+        "total": total,
+        "total_is_estimate": total_is_estimate
+    }
 
 
+def list_stock_categories(session: Session) -> list[dict]:
+    """Every item_category with its number of Stock rows, read through the (item_category, id) index."""
+    rows = session.execute(
+        select(Stock.item_category, func.count())
+        .group_by(Stock.item_category)
+        .order_by(Stock.item_category)
+    ).all()
+    return [{"category": category, "count": count} for category, count in rows]
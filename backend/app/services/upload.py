@@ -1,163 +1,596 @@
+import itertools
+import math
 import pandas as pd
-from io import BytesIO
+import pyarrow as pa
+import time
+from io import StringIO
 from sqlmodel import Session, select
-from datetime import datetime
-from typing import Optional
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime
+from typing import Iterable, Iterator, Optional
 from pathlib import Path
 
 from ..models import Sales, Upload, User, Product
 from .prediction.unified_prediction_service import UnifiedPredictionService
 
 from app.models import Stock
-from app.services.stock import populate_stock_from_product
+from app.services.replenishment import refresh_replenishment
+from app.services.response_cache import response_cache
+from app.services.sales import refresh_sales_daily
+from app.services.stock import (
+    populate_stock_from_product, refresh_daily_sales_rate, refresh_item_sales_stats
+)
+from app.core.config import settings
+from app.services.upload_reader import (
+    KNOWN_COLUMN_TYPES, estimate_upload_rows, iter_upload_chunks, read_upload_sample
+)
+from app.services.upload_validation import (
+    ValidationReport, missing_required_columns, summarize_report, validate_upload_chunk
+)
 
-def upsert_products_from_df(df, user, session):
-    # Only take the required fields, and make sure they are all lowercase.
-    df = df[["date", "item_nbr", "item_name", "category"]].copy()
-    df.columns = df.columns.str.lower()
-    df["store_nbr"] = user.store_nbr
-
-    for _, row in df.iterrows():
-        key_store = user.store_nbr
-        key_item = int(row["item_nbr"])
-        date_val = pd.to_datetime(row["date"]).date()
-        item_name = str(row["item_name"]) if not pd.isnull(row["item_name"]) else None
-        category = str(row["category"]) if not pd.isnull(row["category"]) else None
-
-        # Search existing product records (unique index store_nbr + item_nbr)
-        existing = session.exec(
-            select(Product)
-            .where(Product.store_nbr == key_store)
-            .where(Product.item_nbr == key_item)
-        ).first()
-
-        if existing:
-            # Only update the date to the latest date, otherwise leave it unchanged.
-            if date_val > existing.date:
-                existing.date = date_val
-        else:
-            session.add(Product(
-                store_nbr=key_store,
-                item_nbr=key_item,
-                item_name=item_name,
-                item_category=category,
-                date=date_val
-            ))
-    session.commit()
+SALES_KEY_COLUMNS = ["date", "store_nbr", "item_nbr"]
+SALES_VALUE_COLUMNS = [
+    "unit_sales", "onpromotion", "category", "holiday",
+    "item_class", "perishable", "price", "cost_price"
+]
+# Rows per INSERT ... ON CONFLICT statement
+SALES_UPSERT_CHUNK_SIZE = 5000
 
 
-async def process_upload_file(
-    file,
-    user: User,
+def _frame_to_records(df: pd.DataFrame) -> list[dict]:
+    # NaN / pd.NA -> None so psycopg2 binds SQL NULL
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def bulk_upsert_sales(
+    sales: pd.DataFrame,
     session: Session,
-    prediction_type: str = "today",
-    return_df: bool = False  # allow return df
+    chunk_size: int = SALES_UPSERT_CHUNK_SIZE
 ) -> dict:
-    content = await file.read()
-    filename = file.filename.lower()
-
-    # 1. Read the uploaded content
-    if filename.endswith('.csv'):
-        df = pd.read_csv(BytesIO(content), encoding="utf-8")
-    elif filename.endswith('.xlsx') or filename.endswith('.xls'):
-        df = pd.read_excel(BytesIO(content))
-    else:
-        raise Exception("Unsupported file format")
+    """
+    Write a validated upload chunk into the Sales table with chunked INSERT ... ON CONFLICT DO UPDATE.
+    Duplicate (date, store_nbr, item_nbr) keys inside the file keep the last row.
+    Returns the number of inserted, updated and unchanged rows, and the (store_nbr, item_nbr)
+    keys and (store_nbr, date) days of the inserted/updated ones.
+    """
+    sales = sales[SALES_KEY_COLUMNS + SALES_VALUE_COLUMNS]
+    before = len(sales)
+    sales = sales.drop_duplicates(subset=SALES_KEY_COLUMNS, keep="last")
+    duplicates_dropped = before - len(sales)
+
+    stmt = insert(Sales)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=SALES_KEY_COLUMNS,
+        set_={col: stmt.excluded[col] for col in SALES_VALUE_COLUMNS},
+        # Rows whose stored values already match are left alone: no new tuple, no WAL
+        where=or_(*[
+            Sales.__table__.c[col].is_distinct_from(stmt.excluded[col])
+            for col in SALES_VALUE_COLUMNS
+        ])
+    )
+    # xmax = 0 only for freshly inserted tuples; skipped rows return nothing
+    stmt = stmt.returning(
+        literal_column("(xmax = 0)").label("inserted"), Sales.store_nbr, Sales.item_nbr, Sales.date
+    )
+
+    inserted = 0
+    updated = 0
+    changed_keys = set()
+    changed_days = set()
+    for start in range(0, len(sales), chunk_size):
+        records = _frame_to_records(sales.iloc[start:start + chunk_size])
+        # executemany form: SQLAlchemy batches it into multi-row VALUES pages
+        rows = session.execute(stmt, records).all()
+        chunk_inserted = sum(1 for row in rows if row.inserted)
+        inserted += chunk_inserted
+        updated += len(rows) - chunk_inserted
+        changed_keys.update((row.store_nbr, row.item_nbr) for row in rows)
+        changed_days.update((row.store_nbr, row.date) for row in rows)
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": len(sales) - inserted - updated,
+        "duplicates_dropped": duplicates_dropped,
+        "changed_keys": changed_keys,
+        "changed_days": changed_days
+    }
+
+
+def upsert_products_from_df(df, user, session):
+    # Only take the required fields (already validated and typed); rows without an
+    # item name cannot describe a product
+    df = df.loc[df["item_name"].notna(), ["date", "item_nbr", "item_name", "category"]]
+
+    # One row per item: latest date, name/category from the first row that has one
+    # (the same rule as _MERGE_STAGING_PRODUCT_SQL)
+    products = (
+        df.groupby("item_nbr", sort=False)
+        .agg(date=("date", "max"), item_name=("item_name", "first"), item_category=("category", "first"))
+        .reset_index()
+    )
+    products["item_name"] = products["item_name"].astype("string")
+    products["item_category"] = products["item_category"].astype("string")
+    products["store_nbr"] = user.store_nbr
+
+    if products.empty:
+        return
+
+    # Existing products only move their date forward and fill a missing category,
+    # so a category first seen in a later chunk still lands
+    stmt = insert(Product).values(_frame_to_records(products))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["store_nbr", "item_nbr"],
+        set_={
+            "item_category": func.coalesce(Product.item_category, stmt.excluded.item_category),
+            "date": func.greatest(Product.date, stmt.excluded.date)
+        }
+    )
+    session.execute(stmt)
+
+
+STAGING_COLUMNS = SALES_KEY_COLUMNS + SALES_VALUE_COLUMNS + ["item_name"]
+
+_CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE sales_staging (
+        seq         bigserial,
+        date        date    NOT NULL,
+        store_nbr   integer NOT NULL,
+        item_nbr    integer NOT NULL,
+        unit_sales  double precision,
+        onpromotion boolean,
+        category    varchar,
+        holiday     integer,
+        item_class  integer,
+        perishable  integer,
+        price       double precision,
+        cost_price  double precision,
+        item_name   varchar
+    ) ON COMMIT DROP
+"""
 
-    # 2. Standardize column names
-    df.columns = df.columns.str.strip().str.lower()
+# DISTINCT ON keeps the last staged row per key, so keys repeated across chunks merge once
+_MERGE_STAGING_SALES_SQL = f"""
+    WITH latest AS (
+        SELECT DISTINCT ON (date, store_nbr, item_nbr) *
+        FROM sales_staging
+        ORDER BY date, store_nbr, item_nbr, seq DESC
+    ), upserted AS (
+        INSERT INTO sales ({", ".join(SALES_KEY_COLUMNS + SALES_VALUE_COLUMNS)})
+        SELECT {", ".join(SALES_KEY_COLUMNS + SALES_VALUE_COLUMNS)} FROM latest
+        ON CONFLICT (date, store_nbr, item_nbr) DO UPDATE SET
+            {", ".join(f"{col} = EXCLUDED.{col}" for col in SALES_VALUE_COLUMNS)}
+        WHERE ({", ".join(f"sales.{col}" for col in SALES_VALUE_COLUMNS)})
+            IS DISTINCT FROM ({", ".join(f"EXCLUDED.{col}" for col in SALES_VALUE_COLUMNS)})
+        RETURNING (xmax = 0) AS inserted, store_nbr, item_nbr, date
+    )
+    SELECT
+        (SELECT count(*) FROM latest),
+        count(*) FILTER (WHERE inserted),
+        count(*) FILTER (WHERE NOT inserted),
+        array_agg(DISTINCT ARRAY[store_nbr, item_nbr]),
+        array_agg(DISTINCT ARRAY[store_nbr::text, date::text])
+    FROM upserted
+"""
+
+# Same rule as upsert_products_from_df: from the staged rows that name the item, the
+# latest date and the name/category of the first one (file order) that has them;
+# existing products keep their name, and their category unless missing
+_MERGE_STAGING_PRODUCT_SQL = """
+    INSERT INTO product (store_nbr, item_nbr, item_name, item_category, item_inventory, date)
+    SELECT
+        store_nbr, item_nbr,
+        (array_agg(item_name ORDER BY seq))[1],
+        (array_agg(category ORDER BY seq) FILTER (WHERE category IS NOT NULL))[1],
+        0, max(date)
+    FROM sales_staging
+    WHERE item_name IS NOT NULL
+    GROUP BY store_nbr, item_nbr
+    ON CONFLICT (store_nbr, item_nbr) DO UPDATE SET
+        item_category = COALESCE(product.item_category, EXCLUDED.item_category),
+        date = GREATEST(product.date, EXCLUDED.date)
+"""
+
+
+def validated_chunks(
+    chunks: Iterable[pd.DataFrame],
+    store_nbr: int,
+    report: ValidationReport,
+    row_offset: int = 0
+) -> Iterator[pd.DataFrame]:
+    """Coerce each chunk to Sales types (store_nbr forced to the user's store); bad rows go to the report."""
+    for chunk in chunks:
+        missing_cols = missing_required_columns(chunk.columns)
+        if missing_cols:
+            raise Exception(f"Missing columns: {missing_cols}")
+        yield validate_upload_chunk(chunk, store_nbr, report, row_offset)
+        row_offset += len(chunk)
+
+
+def insert_ingest_upload(chunks: Iterable[pd.DataFrame], user: User, session: Session) -> dict:
+    """Default path: batched INSERT ... ON CONFLICT per chunk for product and sales."""
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicates_dropped": 0}
+    changed_keys = set()
+    changed_days = set()
+    for chunk in chunks:
+        upsert_products_from_df(chunk, user, session)
+        chunk_result = bulk_upsert_sales(chunk, session)
+        for key in totals:
+            totals[key] += chunk_result[key]
+        changed_keys |= chunk_result["changed_keys"]
+        changed_days |= chunk_result["changed_days"]
+    return {**totals, "changed_keys": changed_keys, "changed_days": changed_days}
 
-    # 3. Force store_nbr to use the current user's store_nbr for all rows
-    df["store_nbr"] = user.store_nbr
 
-    # 4. Validate required fields
-    required_columns = {
-        "date", "item_nbr", "unit_sales", "onpromotion",
-        "category", "holiday", "item_class", "perishable", "price", "cost_price"
+def copy_ingest_upload(chunks: Iterable[pd.DataFrame], session: Session) -> dict:
+    """
+    Large-upload path: COPY every chunk into a temporary staging table, then merge it
+    into sales and product with one set-based statement each.
+    The staging table lives until the surrounding transaction commits.
+    """
+    # Raw psycopg2 connection bound to the session's transaction
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute("DROP TABLE IF EXISTS sales_staging")
+        cursor.execute(_CREATE_STAGING_SQL)
+
+        # Missing values are written as unquoted empty fields; validation already turned
+        # empty strings into missing values, so no real value is read back as NULL
+        copy_sql = f"COPY sales_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '')"
+        staged = 0
+        for chunk in chunks:
+            buffer = StringIO()
+            chunk[STAGING_COLUMNS].to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            staged += len(chunk)
+
+        cursor.execute(_MERGE_STAGING_PRODUCT_SQL)
+        cursor.execute(_MERGE_STAGING_SALES_SQL)
+        distinct_rows, inserted, updated, changed_keys, changed_days = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": distinct_rows - inserted - updated,
+        "duplicates_dropped": staged - distinct_rows,
+        "changed_keys": {tuple(key) for key in changed_keys or []},
+        "changed_days": {
+            (int(store_nbr), date.fromisoformat(day)) for store_nbr, day in changed_days or []
+        }
     }
-    missing_cols = required_columns - set(df.columns)
+
+
+def ingest_upload(
+    fileobj,
+    filename: str,
+    user: User,
+    session: Session,
+    ingest_mode: str,
+    memory_limit_bytes: int,
+    typed: bool = True,
+    collected: Optional[list] = None,
+    report: Optional[ValidationReport] = None,
+    row_offset: int = 0
+) -> tuple[dict, ValidationReport, str]:
+    """
+    Parse, validate and write one uploaded file. Returns the write counts, validation report and mode used.
+    A resumed chunked upload passes its report so far and the number of rows already received.
+    """
+    # 1. Stream the uploaded content as chunks with standardized column names
+    estimated_rows = estimate_upload_rows(fileobj, filename)
+    chunks = iter_upload_chunks(fileobj, filename, memory_limit_bytes, typed=typed)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        raise Exception("Uploaded file is empty")
+
+    # 2. Validate required fields before any database work, then coerce every chunk
+    missing_cols = missing_required_columns(first_chunk.columns)
     if missing_cols:
         raise Exception(f"Missing columns: {missing_cols}")
-    
-    # Insert or update rows in the Product table (upsert)
-    upsert_products_from_df(df, user, session)
-
-    # 5. Insert or update rows in the Sales table (upsert)
-    rows_upserted = 0
-    for _, row in df.iterrows():
-        key_date = pd.to_datetime(row["date"]).date()
-        key_store = user.store_nbr
-        key_item = int(row["item_nbr"])
-
-        existing = session.exec(
-            select(Sales)
-            .where(Sales.date == key_date)
-            .where(Sales.store_nbr == key_store)
-            .where(Sales.item_nbr == key_item)
-        ).first()
-
-        new_values = dict(
-            date=key_date,
-            store_nbr=key_store,
-            item_nbr=key_item,
-            unit_sales=float(row["unit_sales"]),
-            onpromotion=bool(int(row["onpromotion"])) if not pd.isnull(row["onpromotion"]) else None,
-            category=str(row["category"]) if not pd.isnull(row["category"]) else None,
-            holiday=int(row["holiday"]) if not pd.isnull(row["holiday"]) else None,
-            item_class=int(row["item_class"]) if not pd.isnull(row["item_class"]) else None,
-            perishable=int(row["perishable"]) if not pd.isnull(row["perishable"]) else None,
-            price=float(row["price"]) if not pd.isnull(row["price"]) else None,
-            cost_price=float(row["cost_price"]) if not pd.isnull(row["cost_price"]) else None,
+    report = report if report is not None else ValidationReport()
+    chunks = validated_chunks(itertools.chain([first_chunk], chunks), user.store_nbr, report, row_offset)
+
+    if collected is not None:
+        chunks = (collected.append(chunk) or chunk for chunk in chunks)
+
+    # 3. Insert or update rows in the Product and Sales tables (upsert)
+    if ingest_mode == "auto":
+        estimated_rows = estimated_rows or len(first_chunk)
+        ingest_mode = "copy" if estimated_rows >= settings.COPY_INGEST_ROW_THRESHOLD else "insert"
+
+    if ingest_mode == "copy":
+        sales_result = copy_ingest_upload(chunks, session)
+    elif ingest_mode == "insert":
+        sales_result = insert_ingest_upload(chunks, user, session)
+    else:
+        raise Exception(f"Unsupported ingest mode: {ingest_mode}")
+
+    # Keep the per-item sales aggregate and Stock rates current for the touched items only
+    changed_items = {item_nbr for _, item_nbr in sales_result["changed_keys"]}
+    refresh_item_sales_stats(session, changed_items)
+    refresh_daily_sales_rate(session, changed_items)
+    # Same for the daily rollup, for the changed days only (not needed past this point)
+    refresh_sales_daily(session, sales_result.pop("changed_days"))
+    return sales_result, report, ingest_mode
+
+
+def ingest_upload_with_fallback(
+    fileobj,
+    filename: str,
+    user: User,
+    session: Session,
+    ingest_mode: str,
+    memory_limit_bytes: int,
+    collected: Optional[list] = None,
+    report_data: Optional[dict] = None,
+    row_offset: int = 0
+) -> tuple[dict, ValidationReport, str]:
+    """ingest_upload with a typed Arrow parse first and a text-column retry."""
+    try:
+        with session.begin_nested():
+            return ingest_upload(
+                fileobj, filename, user, session, ingest_mode, memory_limit_bytes,
+                typed=True, collected=collected,
+                report=ValidationReport.from_dict(report_data), row_offset=row_offset
+            )
+    except pa.ArrowInvalid:
+        # A cell the typed Arrow parse rejected: re-read with text columns so that
+        # validation can drop and report the bad rows instead of failing the upload
+        if collected is not None:
+            collected.clear()
+        return ingest_upload(
+            fileobj, filename, user, session, ingest_mode, memory_limit_bytes,
+            typed=False, collected=collected,
+            report=ValidationReport.from_dict(report_data), row_offset=row_offset
         )
 
-        if existing:
-            for k, v in new_values.items():
-                setattr(existing, k, v)
-        else:
-            session.add(Sales(**new_values))
-
-        rows_upserted += 1
-
-    # 6. Record the upload
-    upload = Upload(
-        user_id=user.id,
-        filename=file.filename,
-        status="processed",
-        row_count=rows_upserted,
-        store_nbr=user.store_nbr
-    )
+
+def _check_valid_rows(sales_result: dict, report: ValidationReport):
+    if sales_result["inserted"] + sales_result["updated"] + sales_result["unchanged"] == 0 and report.rows_rejected:
+        raise Exception(f"No valid rows in upload ({summarize_report(report)})")
+
+
+def _memory_limit_bytes(memory_limit_mb: Optional[int]) -> int:
+    # Per-upload memory ceiling, never above the server-wide limit
+    memory_limit_mb = min(memory_limit_mb or settings.UPLOAD_MEMORY_LIMIT_MB, settings.UPLOAD_MEMORY_LIMIT_MB)
+    return memory_limit_mb * 1024 * 1024
+
+
+def preflight_upload(fileobj, filename: str, store_nbr: int, file_size: Optional[int] = None) -> dict:
+    """
+    Check an upload from its header and a sample of rows only, without touching the
+    database. file_size is the size of the whole file when fileobj holds just its beginning.
+    """
+    sample = read_upload_sample(fileobj, filename, total_size=file_size)
+    missing_cols = missing_required_columns(sample.columns)
+
+    report = ValidationReport()
+    date_range = None
+    if not missing_cols and not sample.empty:
+        clean = validate_upload_chunk(sample, store_nbr, report)
+        if not clean.empty:
+            date_range = {"min": str(clean["date"].min()), "max": str(clean["date"].max())}
+
+    return {
+        "filename": filename,
+        "valid": not missing_cols and report.rows_checked > report.rows_rejected,
+        "columns": list(sample.columns),
+        "missing_columns": sorted(missing_cols),
+        "ignored_columns": [col for col in sample.columns if col not in KNOWN_COLUMN_TYPES and col != "store_nbr"],
+        "dtypes": {col: str(dtype) for col, dtype in sample.dtypes.items()},
+        "sample_rows": len(sample),
+        "sample_validation": report.as_dict(),
+        "date_range": date_range,
+        "estimated_rows": estimate_upload_rows(fileobj, filename, total_size=file_size)
+    }
+
+
+def _json_safe(value):
+    """Convert a prediction result into plain JSON values for the Upload.result column."""
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()  # numpy scalar
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if pd.isna(value):
+        return None
+    return str(value)
+
+
+def _record_stage(session: Session, upload: Upload, finished_stage: Optional[str], seconds: float, next_stage: Optional[str]):
+    """Store the duration of the stage that just ended and move the Upload row to the next one."""
+    if finished_stage:
+        upload.stage_timings = {**(upload.stage_timings or {}), finished_stage: round(seconds, 3)}
+    upload.stage = next_stage
     session.add(upload)
     session.commit()
-    populate_stock_from_product(session)
 
-    # 7. Run model prediction
-    base_dir = Path(__file__).resolve().parents[2]  # points to backend/
-    model_path = base_dir / "app" / "models" / "my_saved_model_resaved"
 
-    if not model_path.exists():
-        raise Exception(f"Model directory not found: {model_path}")
+def process_upload_file(
+    fileobj,
+    filename: str,
+    user: User,
+    session: Session,
+    prediction_type: str = "today",
+    return_df: bool = False,  # allow return df
+    ingest_mode: str = "auto",  # auto / insert / copy
+    memory_limit_mb: Optional[int] = None,
+    upload: Optional[Upload] = None  # existing job record to report progress on
+) -> dict:
+    if upload is None:
+        upload = Upload(
+            user_id=user.id,
+            filename=filename,
+            status="running",
+            row_count=None,
+            store_nbr=user.store_nbr
+        )
+    _record_stage(session, upload, None, 0, "ingest")
 
-    predictor = UnifiedPredictionService(model_dir=str(model_path))
+    started = time.perf_counter()
+    collected = [] if return_df else None
+    sales_result, report, ingest_mode = ingest_upload_with_fallback(
+        fileobj, filename, user, session, ingest_mode, _memory_limit_bytes(memory_limit_mb),
+        collected=collected
+    )
+    _check_valid_rows(sales_result, report)
 
-    prediction_result = predictor.predict(
-        data_source=None,
-        prediction_type=prediction_type,
-        save_results=True,
-        user_id=user.id,
-        db=session
+    upload.ingest_mode = ingest_mode
+    result = finish_upload(
+        upload, user, session, prediction_type, sales_result, report, time.perf_counter() - started
     )
 
+    if return_df:
+        result["dataframe"] = pd.concat(collected, ignore_index=True)
+
+    return result
+
+
+def finish_upload(
+    upload: Upload,
+    user: User,
+    session: Session,
+    prediction_type: str,
+    sales_result: dict,
+    report: ValidationReport,
+    ingest_seconds: float
+) -> dict:
+    """Commit the ingest stage, then refresh stock and run the forecast for an ingested upload."""
+    # 4. Record the upload (committed together with the ingested rows)
+    rows_upserted = sales_result["inserted"] + sales_result["updated"] + sales_result["unchanged"]
+    upload.row_count = rows_upserted
+    # Cached analytics of the store go stale when the ingested Sales rows commit
+    response_cache.bump_data_version(session, user.store_nbr)
+    _record_stage(session, upload, "ingest", ingest_seconds, "stock")
+
+    stage_started = time.perf_counter()
+    populate_stock_from_product(session)
+    _record_stage(session, upload, "stock", time.perf_counter() - stage_started, "forecast")
+
+    # 5. Re-forecast only the (store_nbr, item_nbr) series whose Sales rows changed;
+    # forecasts of all other items are left as they are
+    stage_started = time.perf_counter()
+    changed_keys = sales_result["changed_keys"]
+    prediction_result = {"summary": {}, "chart_data": {}, "data_info": {"unique_items": 0}}
+    if changed_keys:
+        base_dir = Path(__file__).resolve().parents[2]  # points to backend/
+        model_path = base_dir / "app" / "models" / "my_saved_model_resaved"
+
+        if not model_path.exists():
+            raise Exception(f"Model directory not found: {model_path}")
+
+        predictor = UnifiedPredictionService(model_dir=str(model_path))
+
+        prediction_result = predictor.predict(
+            data_source=None,
+            prediction_type=prediction_type,
+            save_results=True,
+            user_id=user.id,
+            db=session,
+            changed_keys=changed_keys
+        )
+    reforecast_items = prediction_result["data_info"]["unique_items"]
+    # Reorder metrics follow the new forecasts (and the stock rows just populated)
+    refresh_replenishment(session, user.store_nbr)
+
     result = {
-        "rows_inserted": rows_upserted,
+        "rows_inserted": sales_result["inserted"],
+        "rows_updated": sales_result["updated"],
+        "rows_unchanged": sales_result["unchanged"],
+        "duplicates_dropped": sales_result["duplicates_dropped"],
+        "validation": report.as_dict(),
+        "ingest_mode": upload.ingest_mode,
+        "ingest_seconds": round(ingest_seconds, 3),
+        "rows_per_sec": round(rows_upserted / ingest_seconds, 1) if ingest_seconds > 0 else None,
+        "reforecast_items": reforecast_items,
+        # The summary and chart cover only the re-forecast items, not the whole store;
+        # both are {} when no item was re-forecast
+        "prediction_scope": "changed_items" if reforecast_items else "none",
         "prediction_summary": prediction_result["summary"],
         "chart_data": prediction_result["chart_data"]
     }
 
-    if return_df:
-        result["dataframe"] = df
-
+    upload.result = _json_safe(result)
+    upload.status = "processed"
+    upload.finished_at = datetime.utcnow()
+    _record_stage(session, upload, "forecast", time.perf_counter() - stage_started, None)
     return result
 
 
+def ingest_upload_chunk(
+    upload_id: int,
+    chunk_index: int,
+    fileobj,
+    user: User,
+    session: Session,
+    memory_limit_mb: Optional[int] = None
+) -> Upload:
+    """
+    Write one numbered chunk of a resumable upload. The chunk's rows and the advanced
+    checkpoint on the Upload row are committed in the same transaction, so a chunk is
+    either fully applied and counted or not at all. Re-sending a committed chunk is a no-op.
+    Each chunk is a self-contained file (with header) in the upload's format.
+    """
+    # Row lock: concurrent retries of the same chunk are serialized. populate_existing
+    # reloads the attributes if the row is already in the session (e.g. loaded for the
+    # ownership check), so the checks below see what the previous holder committed
+    upload = session.exec(
+        select(Upload).where(Upload.id == upload_id).with_for_update().execution_options(populate_existing=True)
+    ).one()
+    if upload.status != "receiving":
+        raise Exception(f"Upload is {upload.status}, not accepting chunks")
+    if chunk_index < upload.chunks_committed:
+        session.rollback()
+        return upload
+    if chunk_index > upload.chunks_committed:
+        raise Exception(f"Expected chunk {upload.chunks_committed}, got {chunk_index}")
+    if upload.total_chunks is not None and chunk_index >= upload.total_chunks:
+        raise Exception(f"Upload has only {upload.total_chunks} chunks")
 
+    checkpoint = upload.checkpoint or {}
+    started = time.perf_counter()
+    sales_result, report, ingest_mode = ingest_upload_with_fallback(
+        fileobj, upload.filename, user, session, upload.ingest_mode, _memory_limit_bytes(memory_limit_mb),
+        report_data=checkpoint.get("validation"), row_offset=checkpoint.get("rows_received", 0)
+    )
 
+    totals = checkpoint.get("sales", {})
+    changed_keys = {tuple(key) for key in checkpoint.get("changed_keys", [])} | sales_result.pop("changed_keys")
+    upload.checkpoint = {
+        "rows_received": report.rows_checked,
+        "sales": {key: totals.get(key, 0) + value for key, value in sales_result.items()},
+        "changed_keys": sorted(changed_keys),
+        "validation": report.as_dict(),
+        "ingest_seconds": checkpoint.get("ingest_seconds", 0) + time.perf_counter() - started
+    }
+    upload.chunks_committed = chunk_index + 1
+    session.add(upload)
+    response_cache.bump_data_version(session, user.store_nbr)
+    session.commit()
+    session.refresh(upload)
+    return upload
+
+
+def finish_chunked_upload(upload: Upload, user: User, session: Session) -> dict:
+    """Stock refresh and forecast for a chunked upload whose chunks are all committed."""
+    checkpoint = upload.checkpoint or {}
+    sales_result = {
+        **(checkpoint.get("sales") or {"inserted": 0, "updated": 0, "unchanged": 0, "duplicates_dropped": 0}),
+        "changed_keys": {tuple(key) for key in checkpoint.get("changed_keys", [])}
+    }
+    report = ValidationReport.from_dict(checkpoint.get("validation"))
+    if report.rows_checked == 0:
+        raise Exception("Uploaded file is empty")
+    _check_valid_rows(sales_result, report)
+    return finish_upload(
+        upload, user, session, upload.prediction_type, sales_result, report, checkpoint.get("ingest_seconds", 0)
+    )
@@ -0,0 +1,287 @@
+# backend/app/services/upload_jobs.py
+
+import hashlib
+import os
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.database import advisory_lock_key, engine
+from app.models import Upload, User
+from app.services.upload import finish_chunked_upload, process_upload_file
+
+# Bounded pool: at most UPLOAD_WORKERS uploads are parsed/forecast at the same time,
+# the rest wait with status "queued".
+_executor = ThreadPoolExecutor(max_workers=settings.UPLOAD_WORKERS, thread_name_prefix="upload-job")
+
+# A job holds a session-level advisory lock on its own connection while it runs. Postgres
+# drops it when the process dies, so a queued/running row whose lock is free has no worker.
+_TRY_JOB_LOCK_SQL = text("SELECT pg_try_advisory_lock(:key)")
+_JOB_UNLOCK_SQL = text("SELECT pg_advisory_unlock(:key)")
+
+INTERRUPTED_ERROR = "Processing was interrupted by a server restart; please upload the file again"
+
+
+def save_upload_file(file, directory: str = settings.UPLOAD_DIR) -> tuple[str, str]:
+    """
+    Copy the request's upload spool to disk so the job can outlive the request.
+    The sha256 of the content is computed in the same streaming pass.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}_{os.path.basename(file.filename)}")
+    digest = hashlib.sha256()
+    with open(path, "wb") as out:
+        while block := file.file.read(1 << 20):
+            digest.update(block)
+            out.write(block)
+    return path, digest.hexdigest()
+
+
+def find_identical_upload(session: Session, store_nbr: int, content_hash: str, prediction_type: str) -> Optional[Upload]:
+    """
+    Return the store's latest upload if it had exactly this content and prediction type.
+    Only the latest one counts: any later upload may have changed the same Sales rows.
+    """
+    latest = session.exec(
+        select(Upload)
+        .where(Upload.store_nbr == store_nbr)
+        .where(Upload.status != "failed")
+        .order_by(Upload.created_at.desc(), Upload.id.desc())
+        .limit(1)
+    ).first()
+    if (
+        latest is not None
+        and latest.status == "processed"
+        and latest.content_hash == content_hash
+        and latest.prediction_type == prediction_type
+    ):
+        return latest
+    return None
+
+
+def enqueue_upload(
+    file,
+    user: User,
+    session: Session,
+    prediction_type: str = "today",
+    ingest_mode: str = "auto",
+    memory_limit_mb: Optional[int] = None
+) -> Upload:
+    file_path, content_hash = save_upload_file(file)
+
+    previous = find_identical_upload(session, user.store_nbr, content_hash, prediction_type)
+    if previous is not None:
+        # Same bytes as the last processed upload: reuse its forecast, skip ingest entirely
+        os.remove(file_path)
+        now = datetime.utcnow()
+        upload = Upload(
+            user_id=user.id,
+            filename=file.filename,
+            status="processed",
+            row_count=previous.row_count,
+            store_nbr=user.store_nbr,
+            prediction_type=prediction_type,
+            ingest_mode=previous.ingest_mode,
+            result=previous.result,
+            content_hash=content_hash,
+            duplicate_of=previous.duplicate_of or previous.id,
+            started_at=now,
+            finished_at=now
+        )
+        session.add(upload)
+        session.commit()
+        session.refresh(upload)
+        return upload
+
+    upload = Upload(
+        user_id=user.id,
+        filename=file.filename,
+        status="queued",
+        row_count=None,
+        store_nbr=user.store_nbr,
+        file_path=file_path,
+        prediction_type=prediction_type,
+        ingest_mode=ingest_mode,
+        content_hash=content_hash
+    )
+    session.add(upload)
+    session.commit()
+    session.refresh(upload)
+
+    _executor.submit(run_upload_job, upload.id, memory_limit_mb)
+    return upload
+
+
+def start_chunked_upload(
+    filename: str,
+    user: User,
+    session: Session,
+    prediction_type: str = "today",
+    ingest_mode: str = "auto",
+    total_chunks: Optional[int] = None
+) -> Upload:
+    """Open a resumable upload; chunks are then sent with ingest_upload_chunk."""
+    upload = Upload(
+        user_id=user.id,
+        filename=filename,
+        status="receiving",
+        row_count=None,
+        store_nbr=user.store_nbr,
+        prediction_type=prediction_type,
+        ingest_mode=ingest_mode,
+        total_chunks=total_chunks,
+        chunks_committed=0
+    )
+    session.add(upload)
+    session.commit()
+    session.refresh(upload)
+    return upload
+
+
+def complete_chunked_upload(upload: Upload, session: Session) -> Upload:
+    """All chunks are committed: queue the stock refresh and forecast."""
+    if upload.status != "receiving":
+        raise Exception(f"Upload is {upload.status}, not receiving chunks")
+    if upload.total_chunks is not None and upload.chunks_committed < upload.total_chunks:
+        raise Exception(f"Only {upload.chunks_committed} of {upload.total_chunks} chunks received")
+
+    upload.status = "queued"
+    session.add(upload)
+    session.commit()
+    session.refresh(upload)
+
+    _executor.submit(run_upload_job, upload.id)
+    return upload
+
+
+def _job_lock_key(upload_id: int) -> int:
+    return advisory_lock_key(f"upload-job:{upload_id}")
+
+
+def run_upload_job(upload_id: int, memory_limit_mb: Optional[int] = None):
+    """Worker entry point: run the full upload pipeline for one queued Upload row."""
+    key = _job_lock_key(upload_id)
+    with engine.connect() as lock_conn:
+        if not lock_conn.execute(_TRY_JOB_LOCK_SQL, {"key": key}).scalar():
+            # Another worker (re-submitted after a restart) already has this job
+            return
+        try:
+            _run_locked_upload_job(upload_id, memory_limit_mb)
+        finally:
+            lock_conn.execute(_JOB_UNLOCK_SQL, {"key": key})
+
+
+def _run_locked_upload_job(upload_id: int, memory_limit_mb: Optional[int]):
+    with Session(engine) as session:
+        upload = session.get(Upload, upload_id)
+        if upload is None or upload.status != "queued":
+            return
+        user = session.get(User, upload.user_id)
+
+        upload.status = "running"
+        upload.started_at = datetime.utcnow()
+        session.add(upload)
+        session.commit()
+
+        try:
+            if upload.file_path is None:
+                # Chunked upload: Sales rows are already committed chunk by chunk
+                finish_chunked_upload(upload, user, session)
+                return
+            with open(upload.file_path, "rb") as fileobj:
+                process_upload_file(
+                    fileobj,
+                    upload.filename,
+                    user,
+                    session,
+                    prediction_type=upload.prediction_type,
+                    ingest_mode=upload.ingest_mode,
+                    memory_limit_mb=memory_limit_mb,
+                    upload=upload
+                )
+        except Exception as e:
+            traceback.print_exc()
+            session.rollback()
+            upload.status = "failed"
+            upload.error = str(e)
+            upload.finished_at = datetime.utcnow()
+            session.add(upload)
+            session.commit()
+        finally:
+            if upload.file_path and os.path.exists(upload.file_path):
+                os.remove(upload.file_path)
+
+
+def recover_upload_jobs() -> dict:
+    """
+    Startup hook: jobs only live in the in-process executor, so a shutdown or crash leaves
+    their rows queued/running. Rows whose job lock is free have no worker left: queued ones
+    are submitted again (their file is still on disk), running ones are marked failed,
+    since re-running a file that took the process down could do so again.
+    Returns the ids re-submitted and failed.
+    """
+    resubmitted, failed = [], []
+    with Session(engine) as session:
+        stale = session.exec(
+            select(Upload).where(Upload.status.in_(("queued", "running"))).order_by(Upload.id)
+        ).all()
+
+    for upload in stale:
+        key = _job_lock_key(upload.id)
+        with engine.connect() as lock_conn:
+            if not lock_conn.execute(_TRY_JOB_LOCK_SQL, {"key": key}).scalar():
+                continue  # a live worker is running it
+            try:
+                file_missing = upload.file_path is not None and not os.path.exists(upload.file_path)
+                if upload.status == "queued" and not file_missing:
+                    resubmitted.append(upload.id)
+                    continue
+                # Only overwrite the status it was read with: another worker may have
+                # finished the job between the select and taking the lock
+                marked = lock_conn.execute(
+                    update(Upload)
+                    .where(Upload.id == upload.id, Upload.status == upload.status)
+                    .values(status="failed", error=INTERRUPTED_ERROR, finished_at=datetime.utcnow())
+                ).rowcount
+                lock_conn.commit()
+                if marked:
+                    failed.append(upload.id)
+                    if upload.file_path and not file_missing:
+                        os.remove(upload.file_path)
+            finally:
+                lock_conn.execute(_JOB_UNLOCK_SQL, {"key": key})
+
+    for upload_id in resubmitted:
+        # run_upload_job re-checks the status under the job lock, so a job also
+        # re-submitted by another worker still runs once
+        _executor.submit(run_upload_job, upload_id)
+    return {"resubmitted": resubmitted, "failed": failed}
+
+
+def upload_job_status(upload: Upload) -> dict:
+    return {
+        "job_id": upload.id,
+        "filename": upload.filename,
+        "status": upload.status,
+        "stage": upload.stage,
+        "stage_timings": upload.stage_timings or {},
+        "row_count": upload.row_count,
+        "error": upload.error,
+        "duplicate_of": upload.duplicate_of,
+        "total_chunks": upload.total_chunks,
+        "chunks_committed": upload.chunks_committed,
+        "created_at": upload.created_at,
+        "started_at": upload.started_at,
+        "finished_at": upload.finished_at,
+        "result": upload.result if upload.status == "processed" else None
+    }
+
+
+def shutdown_upload_workers():
+    _executor.shutdown(wait=False, cancel_futures=True)
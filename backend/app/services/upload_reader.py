@@ -0,0 +1,394 @@
+# backend/app/services/upload_reader.py
+
+import csv
+import gzip
+import io
+import os
+from typing import Iterator, Optional
+
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import zstandard
+from python_calamine import CalamineWorkbook
+
+# Explicit Arrow types for the columns we know, so no type inference per block
+KNOWN_COLUMN_TYPES = {
+    "date": pa.timestamp("s"),
+    "item_nbr": pa.int64(),
+    "unit_sales": pa.float64(),
+    "onpromotion": pa.bool_(),
+    "category": pa.string(),
+    "holiday": pa.int64(),
+    "item_class": pa.int64(),
+    "perishable": pa.int64(),
+    "price": pa.float64(),
+    "cost_price": pa.float64(),
+    "item_name": pa.string(),
+}
+DATE_FORMATS = [pa_csv.ISO8601, "%m/%d/%Y", "%d/%m/%Y"]
+
+# A decoded pandas chunk is several times larger than the raw CSV block it came from
+CHUNK_MEMORY_FACTOR = 8
+MIN_BLOCK_SIZE = 1 << 20  # 1 MB
+# Rough raw size of one cell, used to size Excel/Parquet/Arrow row batches like CSV blocks
+CELL_BYTES = 16
+# Rough in-memory size of one sheet row held by calamine (whole sheet is decoded up front)
+CALAMINE_ROW_BYTES = 512
+
+COMPRESSED_CSV_EXTENSIONS = ('.csv.gz', '.csv.zst')
+CSV_EXTENSIONS = ('.csv',) + COMPRESSED_CSV_EXTENSIONS
+SUPPORTED_EXTENSIONS = CSV_EXTENSIONS + ('.xlsx', '.xls', '.parquet', '.arrow', '.feather', '.ipc')
+ARROW_IPC_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+# Pre-flight checks look at no more than this much of an upload
+SAMPLE_BYTES = 256 * 1024
+SAMPLE_ROWS = 1000
+SAMPLE_MEMORY_LIMIT = 16 << 20  # small first chunk for non-CSV formats
+
+
+def normalize_column(name: str) -> str:
+    return str(name).strip().lower()
+
+
+def rows_per_chunk_for(memory_limit_bytes: int, column_count: int) -> int:
+    return max(1000, block_size_for(memory_limit_bytes) // (CELL_BYTES * max(column_count, 1)))
+
+
+def project_columns(names: list[str]) -> list[str]:
+    """Source column names that map to a known upload column; everything else is never read."""
+    return [name for name in names if normalize_column(name) in KNOWN_COLUMN_TYPES]
+
+
+def block_size_for(memory_limit_bytes: int) -> int:
+    """Raw bytes per CSV block so that one decoded chunk stays under the memory limit."""
+    return max(MIN_BLOCK_SIZE, memory_limit_bytes // CHUNK_MEMORY_FACTOR)
+
+
+def file_size(fileobj) -> int:
+    position = fileobj.tell()
+    fileobj.seek(0, 2)
+    size = fileobj.tell()
+    fileobj.seek(position)
+    return size
+
+
+def open_csv_stream(fileobj, filename: str):
+    """
+    Rewind and return a readable stream of the CSV text. Compressed uploads are
+    decompressed incrementally as the reader pulls blocks; the underlying file
+    is never closed, so it can be re-read.
+    """
+    fileobj.seek(0)
+    if filename.endswith('.gz'):
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if filename.endswith('.zst'):
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False))
+    return fileobj
+
+
+def read_csv_header(fileobj, filename: str = ".csv") -> list[str]:
+    """Read only the header line of a CSV file and rewind."""
+    line = open_csv_stream(fileobj, filename).readline()
+    fileobj.seek(0)
+    return next(csv.reader([line.decode("utf-8-sig")]), [])
+
+
+def decompressed_size(fileobj, filename: str) -> Optional[int]:
+    """
+    Uncompressed size recorded in the file itself, if any: the gzip ISIZE trailer
+    (modulo 4 GB) or the zstd frame header content size.
+    """
+    size = None
+    if filename.endswith('.gz'):
+        fileobj.seek(-4, 2)
+        size = int.from_bytes(fileobj.read(4), "little")
+    elif filename.endswith('.zst'):
+        fileobj.seek(0)
+        content_size = zstandard.frame_content_size(fileobj.read(18))
+        size = content_size if content_size >= 0 else None
+    fileobj.seek(0)
+    return size
+
+
+def estimate_csv_rows(
+    fileobj,
+    filename: str = ".csv",
+    sample_bytes: int = 1 << 16,
+    total_size: Optional[int] = None
+) -> int:
+    """
+    Estimate the number of data rows from the average line length of the first block.
+    Compressed files are scaled by their recorded uncompressed size, or else by the
+    compressed bytes it took to decompress the sample.
+    total_size overrides the size of a plain CSV when fileobj only holds its beginning.
+    """
+    size = total_size or file_size(fileobj)
+    total = decompressed_size(fileobj, filename) if filename.endswith(COMPRESSED_CSV_EXTENSIONS) else size
+    if not total:
+        sample_bytes = 4 << 20  # decompressor read-ahead skews small samples
+
+    stream = open_csv_stream(fileobj, filename)
+    sample = stream.read(sample_bytes)
+    if total:
+        size, consumed = total, len(sample)
+    else:
+        consumed = fileobj.tell()
+    fileobj.seek(0)
+
+    lines = sample.count(b"\n")
+    if len(sample) < sample_bytes:  # the whole file fit in the sample
+        if sample and not sample.endswith(b"\n"):
+            lines += 1
+        return max(lines - 1, 0)  # minus the header
+    return max(int(size * lines / max(consumed, 1)) - 1, 0)
+
+
+def iter_csv_chunks(
+    fileobj,
+    memory_limit_bytes: int,
+    typed: bool = True,
+    filename: str = ".csv"
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file (optionally .gz/.zst compressed) as pandas chunks with the Arrow
+    CSV reader. Only one block is decoded at a time, so peak memory follows
+    memory_limit_bytes instead of the (decompressed) file size.
+    With typed=False the known columns are read as text and left to upload validation,
+    so a single bad cell does not abort the parse.
+    """
+    header = read_csv_header(fileobj, filename)
+    column_types = {
+        raw: KNOWN_COLUMN_TYPES[normalize_column(raw)] if typed else pa.string()
+        for raw in header
+        if normalize_column(raw) in KNOWN_COLUMN_TYPES
+    }
+
+    reader = pa_csv.open_csv(
+        open_csv_stream(fileobj, filename),
+        read_options=pa_csv.ReadOptions(block_size=block_size_for(memory_limit_bytes), use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=DATE_FORMATS,
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        chunk = batch.to_pandas()
+        check_chunk_memory(chunk, memory_limit_bytes)
+        yield chunk
+
+
+def iter_excel_chunks(fileobj, filename: str, memory_limit_bytes: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream the first worksheet of an Excel file in row batches.
+    The Rust-backed calamine reader is used whenever the decoded sheet is known to fit
+    the upload memory limit (and always for legacy .xls); larger .xlsx sheets, and sheets
+    without a <dimension> to size them by, fall back to openpyxl's read-only mode, which
+    parses rows lazily from the sheet XML.
+    """
+    if not filename.endswith('.xlsx'):
+        use_calamine = True
+    else:
+        estimated_rows = estimate_xlsx_rows(fileobj)
+        use_calamine = estimated_rows is not None and estimated_rows * CALAMINE_ROW_BYTES <= memory_limit_bytes
+    fileobj.seek(0)
+
+    if use_calamine:
+        sheet = CalamineWorkbook.from_filelike(fileobj).get_sheet_by_index(0)
+        yield from _iter_row_batches(sheet.iter_rows(), memory_limit_bytes)
+        return
+
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        yield from _iter_row_batches(rows, memory_limit_bytes)
+    finally:
+        workbook.close()
+
+
+def _iter_row_batches(rows, memory_limit_bytes: int) -> Iterator[pd.DataFrame]:
+    """Group spreadsheet rows (header first) into DataFrame chunks sized like CSV blocks."""
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [
+        str(name) if name not in (None, "") else f"unnamed: {i}"
+        for i, name in enumerate(header)
+    ]
+    rows_per_chunk = rows_per_chunk_for(memory_limit_bytes, len(columns))
+
+    batch = []
+    for row in rows:
+        # calamine reports empty cells as "", openpyxl as None
+        row = [None if value == "" else value for value in row]
+        if all(value is None for value in row):
+            continue
+        batch.append(row)
+        if len(batch) >= rows_per_chunk:
+            yield _excel_batch_to_frame(batch, columns, memory_limit_bytes)
+            batch = []
+    if batch:
+        yield _excel_batch_to_frame(batch, columns, memory_limit_bytes)
+
+
+def _excel_batch_to_frame(batch: list, columns: list[str], memory_limit_bytes: int) -> pd.DataFrame:
+    chunk = pd.DataFrame.from_records(batch, columns=columns).infer_objects()
+    check_chunk_memory(chunk, memory_limit_bytes)
+    return chunk
+
+
+def estimate_xlsx_rows(fileobj) -> Optional[int]:
+    """Row count from the sheet's <dimension> element, without reading any rows."""
+    fileobj.seek(0)
+    workbook = openpyxl.load_workbook(fileobj, read_only=True)
+    try:
+        max_row = workbook.worksheets[0].max_row
+    finally:
+        workbook.close()
+        fileobj.seek(0)
+    return max(max_row - 1, 0) if max_row else None
+
+
+def iter_parquet_chunks(fileobj, memory_limit_bytes: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet file batch by batch. Only the known upload columns are projected,
+    so other columns are never decoded.
+    """
+    parquet = pq.ParquetFile(fileobj)
+    columns = project_columns(parquet.schema_arrow.names)
+    for batch in parquet.iter_batches(
+        batch_size=rows_per_chunk_for(memory_limit_bytes, len(columns)),
+        columns=columns
+    ):
+        yield _arrow_batch_to_frame(batch, memory_limit_bytes)
+
+
+def _open_arrow_ipc(fileobj):
+    """Memory-map the file when it lives on disk, so record batches are zero-copy views."""
+    path = getattr(fileobj, "name", None)
+    source = pa.memory_map(path) if isinstance(path, str) and os.path.exists(path) else fileobj
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        # Not the random-access file format: try the streaming IPC format
+        if source is fileobj:
+            fileobj.seek(0)
+        else:
+            source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def iter_arrow_ipc_chunks(fileobj, memory_limit_bytes: int) -> Iterator[pd.DataFrame]:
+    """Read an Arrow IPC (Feather v2) file or stream, projecting the known upload columns."""
+    reader = _open_arrow_ipc(fileobj)
+    columns = project_columns(reader.schema.names)
+    rows_per_chunk = rows_per_chunk_for(memory_limit_bytes, len(columns))
+
+    if isinstance(reader, pa.ipc.RecordBatchFileReader):
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = iter(reader)
+    for batch in batches:
+        batch = batch.select(columns)
+        # Large record batches are sliced (zero-copy) to stay under the memory limit
+        for offset in range(0, batch.num_rows, rows_per_chunk):
+            yield _arrow_batch_to_frame(batch.slice(offset, rows_per_chunk), memory_limit_bytes)
+
+
+def _arrow_batch_to_frame(batch: pa.RecordBatch, memory_limit_bytes: int) -> pd.DataFrame:
+    # split_blocks lets null-free numeric columns convert without a copy
+    chunk = batch.to_pandas(split_blocks=True)
+    check_chunk_memory(chunk, memory_limit_bytes)
+    return chunk
+
+
+def estimate_parquet_rows(fileobj) -> int:
+    fileobj.seek(0)
+    rows = pq.ParquetFile(fileobj).metadata.num_rows
+    fileobj.seek(0)
+    return rows
+
+
+def estimate_arrow_ipc_rows(fileobj) -> Optional[int]:
+    """Exact row count of an IPC file from its batch metadata; streams have no footer to read."""
+    fileobj.seek(0)
+    reader = _open_arrow_ipc(fileobj)
+    fileobj.seek(0)
+    if not isinstance(reader, pa.ipc.RecordBatchFileReader):
+        return None
+    return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def check_chunk_memory(chunk: pd.DataFrame, memory_limit_bytes: int):
+    used = int(chunk.memory_usage(deep=True).sum())
+    if used > memory_limit_bytes:
+        raise Exception(
+            f"Upload chunk needs {used // (1 << 20)} MB, above the {memory_limit_bytes // (1 << 20)} MB upload memory limit"
+        )
+
+
+def iter_upload_chunks(fileobj, filename: str, memory_limit_bytes: int, typed: bool = True) -> Iterator[pd.DataFrame]:
+    """Yield the uploaded file as DataFrame chunks with normalized column names."""
+    filename = filename.lower()
+    fileobj.seek(0)
+    if filename.endswith(CSV_EXTENSIONS):
+        chunks = iter_csv_chunks(fileobj, memory_limit_bytes, typed=typed, filename=filename)
+    elif filename.endswith('.xlsx') or filename.endswith('.xls'):
+        chunks = iter_excel_chunks(fileobj, filename, memory_limit_bytes)
+    elif filename.endswith('.parquet'):
+        chunks = iter_parquet_chunks(fileobj, memory_limit_bytes)
+    elif filename.endswith(ARROW_IPC_EXTENSIONS):
+        chunks = iter_arrow_ipc_chunks(fileobj, memory_limit_bytes)
+    else:
+        raise Exception("Unsupported file format")
+
+    for chunk in chunks:
+        chunk.columns = [normalize_column(col) for col in chunk.columns]
+        yield chunk
+
+
+def read_upload_sample(
+    fileobj,
+    filename: str,
+    sample_rows: int = SAMPLE_ROWS,
+    total_size: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    First rows of an upload with normalized column names. CSV files only decode their
+    first SAMPLE_BYTES, and a last line cut off by that limit, or by the end of a prefix
+    (fileobj smaller than total_size), is dropped; other formats stop after their first chunk.
+    """
+    filename = filename.lower()
+    if filename.endswith(CSV_EXTENSIONS):
+        # One byte more than the sample tells whether the stream goes on past it
+        data = open_csv_stream(fileobj, filename).read(SAMPLE_BYTES + 1)
+        is_prefix = total_size is not None and total_size > file_size(fileobj)
+        fileobj.seek(0)
+        if len(data) > SAMPLE_BYTES or is_prefix:
+            data = data[:SAMPLE_BYTES]
+            data = data[:data.rfind(b"\n") + 1]
+        sample = pd.read_csv(io.BytesIO(data), nrows=sample_rows, encoding="utf-8-sig")
+    else:
+        chunk = next(iter_upload_chunks(fileobj, filename, SAMPLE_MEMORY_LIMIT), None)
+        fileobj.seek(0)
+        sample = chunk.head(sample_rows) if chunk is not None else pd.DataFrame()
+    sample.columns = [normalize_column(col) for col in sample.columns]
+    return sample
+
+
+def estimate_upload_rows(fileobj, filename: str, total_size: Optional[int] = None) -> Optional[int]:
+    filename = filename.lower()
+    if filename.endswith('.csv'):
+        return estimate_csv_rows(fileobj, filename, total_size=total_size)
+    if filename.endswith(COMPRESSED_CSV_EXTENSIONS):
+        return estimate_csv_rows(fileobj, filename)
+    if filename.endswith('.xlsx'):
+        return estimate_xlsx_rows(fileobj)
+    if filename.endswith('.parquet'):
+        return estimate_parquet_rows(fileobj)
+    if filename.endswith(ARROW_IPC_EXTENSIONS):
+        return estimate_arrow_ipc_rows(fileobj)
+    return None
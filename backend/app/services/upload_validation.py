@@ -0,0 +1,151 @@
+# backend/app/services/upload_validation.py
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype
+
+REQUIRED_COLUMNS = {
+    "date", "item_nbr", "unit_sales", "onpromotion",
+    "category", "holiday", "item_class", "perishable", "price", "cost_price"
+}
+# Columns a row cannot be stored without (part of the Sales unique key)
+NOT_NULL_COLUMNS = {"date", "item_nbr"}
+
+FLOAT_COLUMNS = ["unit_sales", "price", "cost_price"]
+INTEGER_COLUMNS = ["item_nbr", "holiday", "item_class", "perishable"]
+BOOLEAN_VALUES = {
+    "true": True, "t": True, "yes": True, "y": True, "1": True, "1.0": True,
+    "false": False, "f": False, "no": False, "n": False, "0": False, "0.0": False,
+}
+
+# Keep the report small: per column, only the first few offending rows/values
+MAX_REPORTED_ROWS = 20
+MAX_REPORTED_VALUES = 5
+
+
+class ValidationReport:
+    """Invalid cells collected per column across all chunks of one upload."""
+
+    def __init__(self):
+        self.rows_checked = 0
+        self.rows_rejected = 0
+        self.columns = {}
+
+    def add(self, column: str, original: pd.Series, invalid: pd.Series):
+        bad = original[invalid]
+        if bad.empty:
+            return
+        entry = self.columns.setdefault(column, {"count": 0, "rows": [], "values": []})
+        entry["count"] += len(bad)
+        entry["rows"].extend(bad.index[:MAX_REPORTED_ROWS - len(entry["rows"])].tolist())
+        entry["values"].extend(
+            str(value)[:50] for value in bad.iloc[:MAX_REPORTED_VALUES - len(entry["values"])]
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_checked": self.rows_checked,
+            "rows_rejected": self.rows_rejected,
+            "columns": self.columns
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "ValidationReport":
+        """Rebuild a report saved with as_dict(), e.g. to keep adding chunks of a resumed upload."""
+        report = cls()
+        if data:
+            report.rows_checked = data["rows_checked"]
+            report.rows_rejected = data["rows_rejected"]
+            report.columns = {
+                col: {"count": entry["count"], "rows": list(entry["rows"]), "values": list(entry["values"])}
+                for col, entry in data["columns"].items()
+            }
+        return report
+
+
+def missing_required_columns(columns) -> set:
+    return REQUIRED_COLUMNS - set(columns)
+
+
+def _to_float(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, errors="coerce").astype("float64")
+
+
+def _to_integer(series: pd.Series) -> pd.Series:
+    numbers = pd.to_numeric(series, errors="coerce").astype("float64")
+    numbers[numbers % 1 != 0] = np.nan  # 3.5 is not a valid item/class number
+    return numbers.astype("Int64")
+
+
+def _to_boolean(series: pd.Series) -> pd.Series:
+    if is_bool_dtype(series):
+        return series.astype("boolean")
+    text = series.astype("string").str.strip().str.lower()
+    return text.map(BOOLEAN_VALUES).astype("boolean")
+
+
+def _to_date(series: pd.Series) -> pd.Series:
+    return pd.to_datetime(series, errors="coerce").dt.date
+
+
+def _to_text(series: pd.Series) -> pd.Series:
+    # Empty cells are missing values, whichever reader produced them
+    return series.astype("string").replace("", pd.NA)
+
+
+def validate_upload_chunk(
+    chunk: pd.DataFrame,
+    store_nbr: int,
+    report: ValidationReport,
+    row_offset: int = 0
+) -> pd.DataFrame:
+    """
+    Coerce one upload chunk into Sales column types, whole columns at a time.
+    Rows with a cell that cannot be coerced (or a missing key cell) are dropped and
+    recorded in the report; row numbers are 0-based data rows of the whole file.
+    """
+    chunk = chunk.set_axis(pd.RangeIndex(row_offset, row_offset + len(chunk)))
+
+    coerced = {"date": _to_date(chunk["date"])}
+    for col in INTEGER_COLUMNS:
+        coerced[col] = _to_integer(chunk[col])
+    for col in FLOAT_COLUMNS:
+        coerced[col] = _to_float(chunk[col])
+    coerced["onpromotion"] = _to_boolean(chunk["onpromotion"])
+
+    rejected = pd.Series(False, index=chunk.index)
+    for col, values in coerced.items():
+        invalid = values.isna() & chunk[col].notna()
+        if col in NOT_NULL_COLUMNS:
+            invalid |= chunk[col].isna()
+        report.add(col, chunk[col], invalid)
+        rejected |= invalid
+
+    clean = pd.DataFrame({
+        "date": coerced["date"],
+        "store_nbr": store_nbr,
+        "item_nbr": coerced["item_nbr"],
+        "unit_sales": coerced["unit_sales"],
+        "onpromotion": coerced["onpromotion"],
+        "category": _to_text(chunk["category"]),
+        "holiday": coerced["holiday"],
+        "item_class": coerced["item_class"],
+        "perishable": coerced["perishable"],
+        "price": coerced["price"],
+        "cost_price": coerced["cost_price"],
+        "item_name": _to_text(chunk["item_name"]) if "item_name" in chunk.columns else pd.NA,
+    })[~rejected]
+    clean["item_nbr"] = clean["item_nbr"].astype("int64")
+
+    report.rows_checked += len(chunk)
+    report.rows_rejected += int(rejected.sum())
+    return clean
+
+
+def summarize_report(report: ValidationReport) -> Optional[str]:
+    """One-line description of the rejected columns, for error messages."""
+    if not report.columns:
+        return None
+    return ", ".join(f"{col}: {entry['count']} invalid" for col, entry in report.columns.items())
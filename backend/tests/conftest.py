@@ -0,0 +1,70 @@
+# backend/tests/conftest.py
+#
+# The tests run against a real PostgreSQL database (row locks, COPY, advisory locks):
+# point TEST_DATABASE_URL at a disposable database. Every test starts from empty tables.
+#
+#   TEST_DATABASE_URL=postgresql+psycopg2://postgres@localhost/shelf_test python -m pytest tests
+
+import io
+import os
+import sys
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# Settings are read when app modules are imported: no engine connects until a test runs
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+psycopg2://localhost/shelf_test"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["SCHEDULER_ENABLED"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SALES_COLUMNS = [
+    "date", "store_nbr", "item_nbr", "unit_sales", "onpromotion", "category", "holiday",
+    "item_class", "perishable", "item_name", "cost_price", "price"
+]
+
+
+@pytest.fixture
+def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from sqlmodel import SQLModel
+    import app.models  # noqa: F401  (registers every table for drop_all)
+    from app.database import create_db_and_tables, engine
+    from app.services.response_cache import response_cache
+
+    engine.echo = False
+    SQLModel.metadata.drop_all(engine)
+    create_db_and_tables()
+    response_cache.clear()
+    return engine
+
+
+@pytest.fixture
+def user(engine):
+    from sqlmodel import Session
+    from app.models import User
+
+    with Session(engine) as session:
+        user = User(name="Test", business_name="Test", email="test@example.com", hashed_password="x", store_nbr=1)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user
+
+
+def sales_csv(rows: list[dict]) -> io.BytesIO:
+    """A sales upload file: SALES_COLUMNS header, one line per row (missing keys are empty)."""
+    lines = [",".join(SALES_COLUMNS)]
+    for row in rows:
+        lines.append(",".join("" if row.get(col) is None else str(row[col]) for col in SALES_COLUMNS))
+    return io.BytesIO(("\n".join(lines) + "\n").encode())
+
+
+def sales_row(item_nbr: int, day: str, unit_sales: float = 1.0, **values) -> dict:
+    return {
+        "date": day, "store_nbr": 1, "item_nbr": item_nbr, "unit_sales": unit_sales, "onpromotion": False,
+        "category": "Pantry", "holiday": 0, "item_class": 1, "perishable": 0,
+        "item_name": f"Item {item_nbr}", "cost_price": 1.0, "price": 2.0, **values
+    }
@@ -0,0 +1,30 @@
+# backend/tests/test_chunked_upload.py
+
+from sqlmodel import Session
+
+from conftest import sales_csv, sales_row
+
+
+def test_retried_chunk_sees_the_committed_checkpoint(engine, user):
+    from app.models import Upload
+    from app.services.upload import ingest_upload_chunk
+    from app.services.upload_jobs import start_chunked_upload
+
+    with Session(engine) as session:
+        upload_id = start_chunked_upload("sales.csv", user, session, total_chunks=2).id
+
+    chunk = [sales_row(1, "2017-08-01", 3), sales_row(2, "2017-08-01", 4)]
+    with Session(engine) as retry:
+        # The API loads the row for its ownership check before the chunk is ingested
+        # (kept referenced, so it stays in the session's identity map)
+        loaded = retry.get(Upload, upload_id)
+        assert loaded.chunks_committed == 0
+
+        # The first attempt of chunk 0 commits in the meantime
+        with Session(engine) as first:
+            ingest_upload_chunk(upload_id, 0, sales_csv(chunk), user, first)
+
+        upload = ingest_upload_chunk(upload_id, 0, sales_csv(chunk), user, retry)
+        assert upload.chunks_committed == 1
+        assert upload.checkpoint["sales"]["inserted"] == 2
+        assert sorted(map(tuple, upload.checkpoint["changed_keys"])) == [(1, 1), (1, 2)]
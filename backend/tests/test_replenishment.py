@@ -0,0 +1,29 @@
+# backend/tests/test_replenishment.py
+
+from datetime import timedelta
+
+from sqlmodel import Session, select
+
+
+def test_forecast_demand_covers_the_horizon_only(engine, user):
+    from app.config import DEMO_DATE
+    from app.models import Forecast, Replenishment, Stock
+    from app.services.replenishment import FORECAST_HORIZON_DAYS, refresh_replenishment
+
+    with Session(engine) as session:
+        session.add(Stock(item_nbr=1, item_name="Item 1", item_category="Pantry", item_inventory=50, date=DEMO_DATE))
+        # One unit a day over the horizon, then a spike on the day after it
+        for offset in range(FORECAST_HORIZON_DAYS + 1):
+            session.add(Forecast(
+                user_id=user.id, store_nbr=user.store_nbr, item_nbr=1,
+                prediction_date=DEMO_DATE + timedelta(days=offset),
+                predicted_sales=1.0 if offset < FORECAST_HORIZON_DAYS else 100.0
+            ))
+        session.commit()
+
+        assert refresh_replenishment(session, user.store_nbr) == 1
+        session.commit()
+
+        row = session.exec(select(Replenishment)).one()
+        assert row.demand_source == "forecast"
+        assert row.daily_demand == 1.0
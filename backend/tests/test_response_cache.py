@@ -0,0 +1,58 @@
+# backend/tests/test_response_cache.py
+
+from sqlmodel import Session
+
+
+def _cache():
+    from app.services.response_cache import ResponseCache
+    return ResponseCache(ttl_seconds=300, max_bytes=1 << 20)
+
+
+def test_bump_in_another_worker_makes_entries_stale(engine):
+    # Two caches stand for two worker processes sharing the database
+    worker_a, worker_b = _cache(), _cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    with Session(engine) as session:
+        assert worker_a.get_or_compute(("k",), compute, session, store_nbr=1) == {"n": 1}
+        assert worker_a.get_or_compute(("k",), compute, session, store_nbr=1) == {"n": 1}
+
+        worker_b.bump_data_version(session, 1)
+        # Not committed yet: other transactions still see the old version
+        with Session(engine) as reader:
+            assert worker_a.get_or_compute(("k",), compute, reader, store_nbr=1) == {"n": 1}
+        session.commit()
+
+        assert worker_a.get_or_compute(("k",), compute, session, store_nbr=1) == {"n": 2}
+
+
+def test_store_bump_keeps_other_stores_but_stales_all_store_entries(engine):
+    cache = _cache()
+    with Session(engine) as session:
+        cache.get_or_compute(("k",), lambda: "store 1", session, store_nbr=1)
+        cache.get_or_compute(("k",), lambda: "all", session)
+
+        cache.bump_data_version(session, 2)
+        session.commit()
+
+        assert cache.get_or_compute(("k",), lambda: "store 1 again", session, store_nbr=1) == "store 1"
+        assert cache.get_or_compute(("k",), lambda: "all again", session) == "all again"
+
+
+def test_full_rollup_rebuild_bumps_every_store(engine, user):
+    from app.services.sales import refresh_sales_daily
+
+    cache = _cache()
+    with Session(engine) as session:
+        cache.get_or_compute(("k",), lambda: "before", session, store_nbr=user.store_nbr)
+        cache.get_or_compute(("k",), lambda: "before", session)
+
+        refresh_sales_daily(session)
+        session.commit()
+
+        assert cache.get_or_compute(("k",), lambda: "after", session, store_nbr=user.store_nbr) == "after"
+        assert cache.get_or_compute(("k",), lambda: "after", session) == "after"
@@ -0,0 +1,58 @@
+# backend/tests/test_stock.py
+
+from datetime import date
+
+import pytest
+from sqlmodel import Session
+
+
+def _stock_rows(session: Session) -> list[int]:
+    from app.models import Stock
+
+    rows = [
+        Stock(item_nbr=1, item_name="Item 1", item_category="Pantry", item_inventory=10, date=date(2017, 8, 14)),
+        Stock(item_nbr=1, item_name="Item 1", item_category="Pantry", item_inventory=20, date=date(2017, 8, 15)),
+        Stock(item_nbr=2, item_name="Item 2", item_category="Pantry", item_inventory=30, date=date(2017, 8, 15)),
+    ]
+    session.add_all(rows)
+    session.commit()
+    return [row.id for row in rows]
+
+
+def test_adjust_stock_sums_deltas_per_row(engine):
+    from app.services.stock import adjust_stock
+
+    with Session(engine) as session:
+        old, latest, other = _stock_rows(session)
+        # Listed out of id order; item_nbr=1 means its latest-dated row
+        updated = adjust_stock(session, [
+            {"stock_id": other, "delta": -5},
+            {"item_nbr": 1, "delta": 3},
+            {"stock_id": latest, "delta": 4},
+            {"stock_id": old, "delta": 1},
+        ])
+
+    assert {row["id"]: row["item_inventory"] for row in updated} == {old: 11, latest: 27, other: 25}
+
+
+def test_adjust_stock_with_a_missing_target_writes_nothing(engine):
+    from app.models import Stock
+    from app.services.stock import adjust_stock
+
+    with Session(engine) as session:
+        old, latest, other = _stock_rows(session)
+        with pytest.raises(LookupError, match="item_nbr=99"):
+            adjust_stock(session, [{"stock_id": old, "delta": 5}, {"item_nbr": 99, "delta": 1}])
+        assert session.get(Stock, old).item_inventory == 10
+
+
+def test_update_stock_quantity_of_a_missing_row_is_404(engine):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with Session(engine) as session:
+        old, latest, other = _stock_rows(session)
+
+    client = TestClient(app)
+    assert client.put(f"/api/stock/update/{latest}", params={"added_quantity": 2}).json()["item_inventory"] == 22
+    assert client.put(f"/api/stock/update/{other + 1}", params={"added_quantity": 2}).status_code == 404
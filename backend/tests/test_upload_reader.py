@@ -0,0 +1,46 @@
+# backend/tests/test_upload_reader.py
+
+import io
+
+from conftest import sales_csv, sales_row
+
+
+def _prefix(rows: int) -> tuple[io.BytesIO, int]:
+    """The beginning of a sales file, cut in the middle of its last line, and the full size."""
+    data = sales_csv([sales_row(item, "2017-08-01") for item in range(1, rows + 1)]).getvalue()
+    cut = data.rfind(b"\n", 0, len(data) - 1) + 5
+    return io.BytesIO(data[:cut]), len(data)
+
+
+def test_sample_of_a_short_prefix_drops_the_cut_off_line():
+    from app.services.upload_reader import SAMPLE_BYTES, read_upload_sample
+
+    prefix, total_size = _prefix(20)
+    assert len(prefix.getvalue()) < SAMPLE_BYTES
+
+    sample = read_upload_sample(prefix, "sales.csv", total_size=total_size)
+
+    assert len(sample) == 19
+    assert str(sample["item_nbr"].dtype) == "int64"
+    assert prefix.tell() == 0
+
+
+def test_sample_of_a_whole_file_keeps_its_last_line():
+    from app.services.upload_reader import read_upload_sample
+
+    data = sales_csv([sales_row(item, "2017-08-01") for item in range(1, 21)]).getvalue()
+    # No trailing newline: the file still ends with a complete row
+    sample = read_upload_sample(io.BytesIO(data.rstrip(b"\n")), "sales.csv", total_size=len(data) - 1)
+
+    assert len(sample) == 20
+
+
+def test_preflight_of_a_prefix_rejects_no_rows():
+    from app.services.upload import preflight_upload
+
+    prefix, total_size = _prefix(20)
+    report = preflight_upload(prefix, "sales.csv", store_nbr=1, file_size=total_size)
+
+    assert report["valid"]
+    assert report["sample_rows"] == 19
+    assert report["sample_validation"]["rows_rejected"] == 0
@@ -66,6 +66,9 @@ alter table public.sales
 create index ix_sales_store_nbr
     on public.sales (store_nbr);
 
+create index ix_sales_item_nbr_date
+    on public.sales (item_nbr, date);
+
 create table public.upload
 (
     id         serial
@@ -76,7 +79,21 @@ create table public.upload
     status     varchar   not null,
     row_count  integer,
     created_at timestamp not null,
-    store_nbr  integer   not null
+    store_nbr  integer   not null,
+    file_path       varchar,
+    prediction_type varchar,
+    ingest_mode     varchar,
+    stage           varchar,
+    stage_timings   json,
+    result          json,
+    error           varchar,
+    started_at      timestamp,
+    finished_at     timestamp,
+    content_hash    varchar,
+    duplicate_of    integer,
+    total_chunks     integer,
+    chunks_committed integer,
+    checkpoint       json
 );
 
 alter table public.upload
@@ -88,6 +105,9 @@ create index ix_upload_user_id
 create index ix_upload_store_nbr
     on public.upload (store_nbr);
 
+create index ix_upload_content_hash
+    on public.upload (content_hash);
+
 create table public.posconnection
 (
     id           serial
@@ -109,6 +129,128 @@ create index ix_posconnection_store_nbr
 create index ix_posconnection_user_id
     on public.posconnection (user_id);
 
+create table public.stock
+(
+    id               serial
+        primary key,
+    item_nbr         integer   not null,
+    item_name        varchar   not null,
+    item_category    varchar   not null,
+    item_inventory   integer   not null,
+    date             date      not null,
+    created_at       timestamp not null,
+    daily_sales_rate double precision,
+    velocity_7d         double precision,
+    velocity_28d        double precision,
+    velocity_90d        double precision,
+    velocity_updated_at timestamp,
+    constraint unique_stock_item_date
+        unique (item_nbr, date)
+);
+
+alter table public.stock
+    owner to postgres;
+
+create index ix_stock_category_id
+    on public.stock (item_category, id);
+
+create table public.itemsalesstats
+(
+    item_nbr    integer          not null
+        primary key,
+    total_units double precision not null,
+    sales_days  integer          not null,
+    updated_at  timestamp        not null
+);
+
+alter table public.itemsalesstats
+    owner to postgres;
+
+create table public.inventorymovement
+(
+    id           serial
+        primary key,
+    stock_id     integer   not null,
+    kind         varchar   not null,
+    delta        integer   not null,
+    created_at   timestamp not null,
+    compacted_at timestamp
+);
+
+alter table public.inventorymovement
+    owner to postgres;
+
+create index ix_inventorymovement_pending
+    on public.inventorymovement (stock_id)
+    where (compacted_at IS NULL);
+
+create table public.replenishment
+(
+    store_nbr           integer          not null,
+    item_nbr            integer          not null,
+    stock_id            integer          not null,
+    item_name           varchar          not null,
+    item_category       varchar          not null,
+    current_inventory   integer          not null,
+    daily_demand        double precision not null,
+    demand_source       varchar          not null,
+    days_of_cover       double precision,
+    reorder_point       double precision not null,
+    order_up_to         double precision not null,
+    suggested_order_qty integer          not null,
+    priority            varchar          not null,
+    updated_at          timestamp        not null,
+    primary key (store_nbr, item_nbr)
+);
+
+alter table public.replenishment
+    owner to postgres;
+
+create index ix_replenishment_store_cover
+    on public.replenishment (store_nbr, days_of_cover);
+
+create table public.scheduledjobrun
+(
+    name        varchar   not null
+        primary key,
+    finished_at timestamp not null
+);
+
+alter table public.scheduledjobrun
+    owner to postgres;
+
+create table public.dataversion
+(
+    store_nbr integer not null
+        primary key,
+    version   integer not null
+);
+
+alter table public.dataversion
+    owner to postgres;
+
+create table public.salesdaily
+(
+    id        serial
+        primary key,
+    store_nbr integer not null,
+    date      date    not null,
+    category  varchar,
+    revenue   double precision,
+    units     double precision,
+    profit    double precision,
+    row_count integer not null
+);
+
+alter table public.salesdaily
+    owner to postgres;
+
+create unique index ux_salesdaily_store_date_category
+    on public.salesdaily (store_nbr, date, COALESCE(category, ''));
+
+create index ix_salesdaily_date
+    on public.salesdaily (date);
+
 create table public.forecast
 (
     id              serial
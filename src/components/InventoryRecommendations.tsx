@@ -4,6 +4,8 @@ import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { AlertTriangle, Clock, TrendingDown, ShoppingCart } from "lucide-react";
 import { useToast } from "@/hooks/use-toast";
+import { useEffect, useState } from "react";
+import { fetchWithAuth } from "@/lib/api";
 
 interface Product {
   id: string;
@@ -19,59 +21,25 @@ interface Product {
 const InventoryRecommendations = () => {
   const { toast } = useToast();
 
-  // Mock data - in real app this would come from API based on sales trends
-  const recommendations: Product[] = [
-    {
-      id: "1",
-      name: "Milk",
-      category: "Dairy",
-      currentStock: 8,
-      dailyConsumption: 15,
-      daysRemaining: 0.5,
-      priority: 'urgent',
-      suggestedOrderQuantity: 100
-    },
-    {
-      id: "2", 
-      name: "Bread",
-      category: "Bakery",
-      currentStock: 15,
-      dailyConsumption: 12,
-      daysRemaining: 1.2,
-      priority: 'urgent',
-      suggestedOrderQuantity: 80
-    },
-    {
-      id: "3",
-      name: "Eggs",
-      category: "Dairy", 
-      currentStock: 12,
-      dailyConsumption: 8,
-      daysRemaining: 1.5,
-      priority: 'urgent',
-      suggestedOrderQuantity: 60
-    },
-    {
-      id: "4",
-      name: "Rice",
-      category: "Grains",
-      currentStock: 25,
-      dailyConsumption: 8,
-      daysRemaining: 3.1,
-      priority: 'medium',
-      suggestedOrderQuantity: 50
-    },
-    {
-      id: "5",
-      name: "Chips",
-      category: "Snacks",
-      currentStock: 18,
-      dailyConsumption: 5,
-      daysRemaining: 3.6,
-      priority: 'medium',
-      suggestedOrderQuantity: 40
-    }
-  ];
+  const [recommendations, setRecommendations] = useState<Product[]>([]);
+
+  useEffect(() => {
+    // Precomputed server-side after each forecast run; only items that need an order
+    fetchWithAuth("/api/stock/recommendations?reorder_only=true&limit=20")
+      .then((data) => {
+        setRecommendations(data.items.map((item: any) => ({
+          id: `${item.store_nbr}-${item.item_nbr}`,
+          name: item.item_name,
+          category: item.item_category,
+          currentStock: item.current_inventory,
+          dailyConsumption: parseFloat(item.daily_demand.toFixed(1)),
+          daysRemaining: item.days_of_cover ?? 0,
+          priority: item.priority,
+          suggestedOrderQuantity: item.suggested_order_qty
+        })));
+      })
+      .catch((error) => console.error("Failed to load recommendations:", error));
+  }, []);
 
   const urgentProducts = recommendations.filter(p => p.priority === 'urgent');
   const mediumProducts = recommendations.filter(p => p.priority === 'medium');
@@ -120,3 +120,21 @@ export async function getBottomItemsSold(params: { start_date?: string; end_date
   if (!response.ok) throw new Error("Failed to fetch bottom items");
   return await response.json() as TopItem[];
 }
+
+export type SalesDashboard = {
+  latest_date: string | null;
+  daily_revenue: DailyRevenue[];
+  daily_category_revenue: DailyCategoryRevenue[];
+  daily_unit_sales: DailyUnitSales[];
+  daily_profit: DailyProfit[];
+  top_items: TopItem[];
+  bottom_items: TopItem[];
+};
+
+// All dashboard sales series in one request (daily series + top/bottom items + latest date)
+export async function getSalesDashboard(params: { start_date?: string; end_date?: string; limit?: number; top_limit?: number; item_days?: number } = {}) {
+  const urlParams = new URLSearchParams(params as any).toString();
+  const response = await fetch(`/api/sales/dashboard?${urlParams}`);
+  if (!response.ok) throw new Error("Failed to fetch sales dashboard");
+  return await response.json() as SalesDashboard;
+}
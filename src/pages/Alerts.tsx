@@ -6,6 +6,11 @@ import { Button } from "@/components/ui/button";
 import { AlertTriangle, Package, Clock } from "lucide-react";
 import Navigation from "@/components/Navigation";
 
+// Days of cover at or below which an item is critical / low
+const CRITICAL_DAYS_LEFT = 5;
+const LOW_DAYS_LEFT = 15;
+const STOCK_ALERT_FIELDS = "id,item_name,item_category,item_inventory,date,daily_sales_rate,velocity_28d";
+
 interface Product {
   id: string;
   name: string;
@@ -20,22 +25,50 @@ const Alerts = () => {
   const [products, setProducts] = useState<Product[]>([]);
   const [selectedCategory, setSelectedCategory] = useState<string | null>(null);
   const [selectedStatus, setSelectedStatus] = useState<string | null>(null);
+  const [safeCount, setSafeCount] = useState(0);
 
   useEffect(() => {
+    // Walk the keyset pages of one server-side filter, fetching only the columns alerts need
+    const fetchAlertPages = async (filter: Record<string, number>) => {
+      const rows: any[] = [];
+      let afterId: number | null = null;
+      do {
+        const response = await axios.get("/api/stock", {
+          params: {
+            limit: 1000,
+            fields: STOCK_ALERT_FIELDS,
+            ...filter,
+            ...(afterId !== null ? { after_id: afterId } : {}),
+          },
+        });
+        rows.push(...response.data.items);
+        afterId = response.data.next_after_id;
+      } while (afterId !== null);
+      return rows;
+    };
+
     const fetchStock = async () => {
       try {
-        const response = await axios.get("/api/stock");
-        const stockData = response.data;
+        // Only items that need attention are loaded: running out within LOW_DAYS_LEFT days,
+        // or already out of stock whatever their sales rate. Safe items are only counted.
+        const [runningOut, outOfStock, all] = await Promise.all([
+          fetchAlertPages({ max_days_left: LOW_DAYS_LEFT }),
+          fetchAlertPages({ max_inventory: 0 }),
+          axios.get("/api/stock", { params: { limit: 1, fields: "id" } }),
+        ]);
+        const stockData = [...new Map([...runningOut, ...outOfStock].map((item) => [item.id, item])).values()];
 
         const mappedProducts: Product[] = stockData.map((item: any) => {
           const quantity = item.item_inventory;
-          const dailyRate = item.daily_sales_rate ? parseFloat(item.daily_sales_rate.toFixed(1)) : 0;
+          // Recent 28-day velocity when the scheduler has computed it, lifetime average otherwise
+          const rate = item.velocity_28d ?? item.daily_sales_rate;
+          const dailyRate = rate ? parseFloat(rate.toFixed(1)) : 0;
 
           const daysRemaining = dailyRate > 0 ? quantity / dailyRate : 0;
 
           let status: 'critical' | 'low' | 'safe' = 'safe';
-          if (daysRemaining <= 5) status = 'critical';
-          else if (daysRemaining <= 15) status = 'low';
+          if (daysRemaining <= CRITICAL_DAYS_LEFT) status = 'critical';
+          else if (daysRemaining <= LOW_DAYS_LEFT) status = 'low';
           else status = 'safe';
           return {
             id: item.id.toString(),
@@ -49,6 +82,8 @@ const Alerts = () => {
         });
 
         setProducts(mappedProducts);
+        // The unfiltered total is the planner's estimate on large tables
+        setSafeCount(Math.max((all.data.total ?? 0) - mappedProducts.length, 0));
       } catch (error) {
         console.error("Failed to load stock data:", error);
       }
@@ -108,7 +143,6 @@ const Alerts = () => {
 
   const criticalCount = products.filter(p => p.status === 'critical').length;
   const lowCount = products.filter(p => p.status === 'low').length;
-  const safeCount = products.filter(p => p.status === 'safe').length;
 
   const categories = [...new Set(products.map(p => p.category))];
 
@@ -148,7 +182,6 @@ const Alerts = () => {
             <Button variant={selectedStatus === null ? "default" : "outline"} size="sm" onClick={() => setSelectedStatus(null)}>All Status</Button>
             <Button variant={selectedStatus === 'critical' ? "default" : "outline"} size="sm" onClick={() => setSelectedStatus('critical')} className="text-red-600">🔴 Critical</Button>
             <Button variant={selectedStatus === 'low' ? "default" : "outline"} size="sm" onClick={() => setSelectedStatus('low')} className="text-orange-600">🟠 Low</Button>
-            <Button variant={selectedStatus === 'safe' ? "default" : "outline"} size="sm" onClick={() => setSelectedStatus('safe')} className="text-green-600">🟢 Safe</Button>
           </div>
         </div>
 
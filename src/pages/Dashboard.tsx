@@ -11,10 +11,7 @@
   import InventoryRecommendations from "@/components/InventoryRecommendations";
   import { useEffect, useState } from "react";
   import { getPastPerformance, SalesRecord } from "@/lib/api";
-  import { getDailyTotalRevenue, DailyRevenue } from "@/lib/api";
-  import { getDailyTotalUnitSales, DailyUnitSales } from "@/lib/api";
-  import { getTopItemsSold, TopItem } from "@/lib/api";
-  import { getBottomItemsSold } from "@/lib/api";
+  import { DailyRevenue, DailyUnitSales, TopItem, getSalesDashboard } from "@/lib/api";
   import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
   import {
     Sun,
@@ -149,9 +146,12 @@
     }, []);
 
     useEffect(() => {
-      let params: { start_date?: string; end_date?: string; limit?: number } = {};
+      // One request for every sales series; it also returns the latest sales date,
+      // which anchors the week tab's top/bottom item window
+      let params: { start_date?: string; end_date?: string; limit?: number; top_limit?: number; item_days?: number } = {};
       if (performanceTab === "week") {
         params.limit = 14;  // 14 days
+        params.item_days = 6;  // latest date and the 5 days before it
       } else if (performanceTab === "month") {
         params.limit = 30;
       } else if (performanceTab === "year") {
@@ -161,57 +161,31 @@
         if (dateRange.to) params.end_date = format(dateRange.to, "yyyy-MM-dd");
       }
       setDailyRevenueLoading(true);
-      getDailyTotalRevenue(params)
-        .then(setDailyRevenue)
-        .catch(e => setDailyRevenueError(e.message || "Failed to fetch revenue"))
-        .finally(() => setDailyRevenueLoading(false));
-    }, [performanceTab, dateRange]);
-    
-    useEffect(() => {
-      let params: { start_date?: string; end_date?: string; limit?: number } = {};
-      if (performanceTab === "week") {
-        params.limit = 14;
-      } else if (performanceTab === "month") {
-        params.limit = 30;
-      } else if (performanceTab === "year") {
-        params.limit = 365;
-      } else if (performanceTab === "custom") {
-        if (dateRange.from) params.start_date = format(dateRange.from, "yyyy-MM-dd");
-        if (dateRange.to) params.end_date = format(dateRange.to, "yyyy-MM-dd");
-      }
       setDailyUnitSalesLoading(true);
-      getDailyTotalUnitSales(params)
-        .then(setDailyUnitSales)
-        .catch(e => setDailyUnitSalesError(e.message || "Failed to fetch unit sales"))
-        .finally(() => setDailyUnitSalesLoading(false));
-    }, [performanceTab, dateRange]);
-
-    useEffect(() => {
-      // only fetch top items if latestDate is available
-      if (performanceTab === "week" && !latestDate) return;
-    
-      let params: { start_date?: string; end_date?: string; limit?: number } = {};
-    
-      if (performanceTab === "week" && latestDate) {
-        params.limit = 5;
-        params.end_date = latestDate;
-        // use latestDate from database to calculate the start date
-        const end = new Date(latestDate);
-        const start = new Date(end);
-        start.setDate(end.getDate() - 5);
-        params.start_date = format(start, "yyyy-MM-dd");
-      } else if (performanceTab === "custom") {
-        if (dateRange.from) params.start_date = format(dateRange.from, "yyyy-MM-dd");
-        if (dateRange.to) params.end_date = format(dateRange.to, "yyyy-MM-dd");
-      }
       setTopItemsLoading(true);
-      getTopItemsSold(params)
-        .then(setTopItems)
-        .catch(e => setTopItemsError(e.message || "Failed to fetch top items"))
-        .finally(() => setTopItemsLoading(false));
-    }, [performanceTab, dateRange, latestDate]);
-    
-    
+      setBottomItemsLoading(true);
+      getSalesDashboard(params)
+        .then(data => {
+          setLatestDate(data.latest_date);
+          setDailyRevenue(data.daily_revenue);
+          setDailyUnitSales(data.daily_unit_sales);
+          setTopItems(data.top_items);
+          setBottomItems(data.bottom_items);
+        })
+        .catch(e => {
+          const message = e.message || "Failed to fetch sales data";
+          setDailyRevenueError(message);
+          setDailyUnitSalesError(message);
+          setTopItemsError(message);
+          setBottomItemsError(message);
+        })
+        .finally(() => {
+          setDailyRevenueLoading(false);
+          setDailyUnitSalesLoading(false);
+          setTopItemsLoading(false);
+          setBottomItemsLoading(false);
+        });
+    }, [performanceTab, dateRange]);
 
     useEffect(() => {
       async function fetchWeather() {
@@ -227,12 +201,6 @@
       fetchWeather();
     }, [selectedCity]);
 
-    useEffect(() => {
-      fetch("/api/sales/latest_date")
-        .then(res => res.json())
-        .then(data => setLatestDate(data.latest_date));
-    }, []);
-
     useEffect(() => {
       setLoading(true);
       fetchProductForecast(predictionPeriod)
@@ -296,34 +264,6 @@
         .catch(err => console.error("Holiday fetch failed", err))
     }, [])
     
-    useEffect(() => {
-      // logic similar to topItems
-      if (performanceTab === "week" && !latestDate) return;
-    
-      let params: { start_date?: string; end_date?: string; limit?: number } = {};
-    
-      if (performanceTab === "week" && latestDate) {
-        params.limit = 5;
-        params.end_date = latestDate;
-        const end = new Date(latestDate);
-        const start = new Date(end);
-        start.setDate(end.getDate() - 5);
-        params.start_date = format(start, "yyyy-MM-dd");
-      } else if (performanceTab === "custom") {
-        if (dateRange.from) params.start_date = format(dateRange.from, "yyyy-MM-dd");
-        if (dateRange.to) params.end_date = format(dateRange.to, "yyyy-MM-dd");
-      }
-      setBottomItemsLoading(true);
-      getBottomItemsSold(params)
-        .then(setBottomItems)
-        .catch(e => setBottomItemsError(e.message || "Failed to fetch bottom items"))
-        .finally(() => setBottomItemsLoading(false));
-    }, [performanceTab, dateRange, latestDate]);
-
-
-
-
-
     return (
       <div className="min-h-screen bg-gray-50">
         <Navigation />
@@ -1,5 +1,5 @@
 
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -10,18 +10,79 @@ import Navigation from "@/components/Navigation";
 import { useToast } from "@/hooks/use-toast";
 import { useNavigate } from "react-router-dom";
 
+// Large files can take a while to ingest and forecast, but a job lost on the server
+// must not leave the page polling forever
+const UPLOAD_POLL_TIMEOUT_MS = 30 * 60 * 1000;
+
+interface PreflightResult {
+  valid: boolean;
+  missing_columns: string[];
+  sample_rows: number;
+  sample_validation: { rows_rejected: number };
+  date_range: { min: string; max: string } | null;
+  estimated_rows: number | null;
+}
+
+// Only plain CSV files are checked before upload, from their first 256 KB: the other
+// formats need the whole file (zip directory, Parquet footer) and are checked by the upload job
+const PREFLIGHT_BYTES = 256 * 1024;
+
 const Upload = () => {
   const [file, setFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
+  const [preflight, setPreflight] = useState<PreflightResult | null>(null);
+  const [preflightError, setPreflightError] = useState<string | null>(null);
+  const [checking, setChecking] = useState(false);
+  // File the pre-flight result belongs to: a result for a file no longer selected is dropped
+  const checkedFile = useRef<File | null>(null);
   const [posUrl, setPosUrl] = useState("");
   const [apiKey, setApiKey] = useState("");
   const { toast } = useToast();
   const navigate = useNavigate();
 
+  const runPreflight = async (selectedFile: File) => {
+    setChecking(true);
+    try {
+      const formData = new FormData();
+      formData.append("file", selectedFile.slice(0, PREFLIGHT_BYTES), selectedFile.name);
+      const token = localStorage.getItem('access_token');
+      const response = await fetch(`http://127.0.0.1:8000/api/upload/validate?file_size=${selectedFile.size}`, {
+        method: "POST",
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+        body: formData,
+      });
+      const data = await response.json();
+      if (checkedFile.current !== selectedFile) {
+        return;
+      }
+      if (!response.ok) {
+        throw new Error(data.detail || "Validation failed");
+      }
+      setPreflight(data);
+    } catch (error: any) {
+      if (checkedFile.current === selectedFile) {
+        setPreflightError(error.message || "Validation failed");
+      }
+    } finally {
+      if (checkedFile.current === selectedFile) {
+        setChecking(false);
+      }
+    }
+  };
+
   const handleFileUpload = (event: React.ChangeEvent<HTMLInputElement>) => {
     const selectedFile = event.target.files?.[0];
     if (selectedFile) {
       setFile(selectedFile);
+      setPreflight(null);
+      setPreflightError(null);
+      setChecking(false);
+      checkedFile.current = selectedFile;
+      if (selectedFile.name.toLowerCase().endsWith(".csv")) {
+        runPreflight(selectedFile);
+      }
     }
   };
 
@@ -98,10 +159,33 @@ const Upload = () => {
       if (!response.ok) {
         throw new Error(data.detail || "Upload failed");
       }
+
+      // The upload is processed by a background job; poll until it finishes,
+      // but stop waiting after UPLOAD_POLL_TIMEOUT_MS
+      let job = data;
+      const deadline = Date.now() + UPLOAD_POLL_TIMEOUT_MS;
+      while (job.status === "queued" || job.status === "running") {
+        if (Date.now() > deadline) {
+          throw new Error("The upload is still being processed. Check back later before uploading it again.");
+        }
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const statusResponse = await fetch(`http://127.0.0.1:8000/api/upload/${data.job_id}`, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        });
+        job = await statusResponse.json();
+        if (!statusResponse.ok) {
+          throw new Error(job.detail || "Upload failed");
+        }
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error || "Upload failed");
+      }
   
       toast({
         title: "Upload successful!",
-        description: `Your data has been processed. Rows inserted: ${data.rows_inserted}`,
+        description: `Your data has been processed. Rows inserted: ${job.result.rows_inserted}`,
       });
       setUploading(false);
       navigate("/dashboard");
@@ -182,12 +266,12 @@ const Upload = () => {
                       <Input
                         id="file"
                         type="file"
-                        accept=".csv,.xlsx,.xls"
+                        accept=".csv,.gz,.zst,.xlsx,.xls,.parquet,.arrow,.feather"
                         onChange={handleFileUpload}
                         className="cursor-pointer"
                       />
                       <p className="text-sm text-gray-500">
-                        Supported formats: CSV, Excel (.xlsx, .xls)
+                        Supported formats: CSV (also .csv.gz, .csv.zst), Excel (.xlsx, .xls), Parquet, Arrow IPC (.arrow, .feather)
                       </p>
                     </div>
 
@@ -200,6 +284,23 @@ const Upload = () => {
                             <p className="text-sm text-blue-600">
                               {(file.size / 1024 / 1024).toFixed(2)} MB
                             </p>
+                            {checking && <p className="text-sm text-gray-500">Checking file...</p>}
+                            {preflightError && <p className="text-sm text-red-600">{preflightError}</p>}
+                            {preflight && !preflight.valid && (
+                              <p className="text-sm text-red-600">
+                                {preflight.missing_columns.length > 0
+                                  ? `Missing columns: ${preflight.missing_columns.join(", ")}`
+                                  : "No valid rows found in the first rows of the file."}
+                              </p>
+                            )}
+                            {preflight?.valid && (
+                              <p className="text-sm text-blue-600">
+                                ~{preflight.estimated_rows ?? preflight.sample_rows} rows
+                                {preflight.date_range && `, ${preflight.date_range.min} to ${preflight.date_range.max}`}
+                                {preflight.sample_validation.rows_rejected > 0 &&
+                                  ` (${preflight.sample_validation.rows_rejected} invalid rows in sample)`}
+                              </p>
+                            )}
                           </div>
                         </div>
                       </div>
@@ -207,7 +308,7 @@ const Upload = () => {
 
                     <Button 
                       onClick={handleSubmitFile}
-                      disabled={!file || uploading}
+                      disabled={!file || uploading || checking || (preflight !== null && !preflight.valid)}
                       className="w-full bg-gradient-to-r from-blue-600 to-purple-600 hover:from-blue-700 hover:to-purple-700"
                     >
                       {uploading ? "Processing..." : "Submit & Forecast"}
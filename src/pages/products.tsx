@@ -1,4 +1,4 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import axios from "axios";
 import {
   Card, CardContent, CardDescription, CardHeader, CardTitle
@@ -16,6 +16,8 @@ interface Category {
   id: string;
   name: string;
   description?: string;
+  // Stock rows in the category on the server (unset for categories added on this page)
+  count?: number;
 }
 
 interface Product {
@@ -30,6 +32,8 @@ interface Product {
   status?: 'critical' | 'low' | 'safe';
 }
 
+const STOCK_PAGE_SIZE = 200;
+
 const Products = () => {
   const { toast } = useToast();
   const [addCategoryOpen, setAddCategoryOpen] = useState(false);
@@ -41,14 +45,35 @@ const Products = () => {
 
   const [categories, setCategories] = useState<Category[]>([]);
   const [products, setProducts] = useState<Product[]>([]);
+  // Keyset cursor of the next stock page (null once everything is loaded)
+  const [nextAfterId, setNextAfterId] = useState<number | null>(null);
+  const [totalProducts, setTotalProducts] = useState<number | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  useEffect(() => {
-    const fetchStockData = async () => {
-      try {
-        const response = await axios.get("/api/stock");
-        const stockData = response.data;
+  // Category of the pages being shown: a response for a category no longer selected is dropped
+  const categoryRef = useRef<string | null>(null);
+
+  const fetchStockPage = async (afterId: number | null, category: string | null) => {
+    try {
+      setLoadingMore(true);
+      const response = await axios.get("/api/stock", {
+        params: {
+          limit: STOCK_PAGE_SIZE,
+          fields: "id,item_name,item_category,item_inventory,date",
+          ...(category !== null ? { category } : {}),
+          ...(afterId !== null ? { after_id: afterId } : {}),
+        },
+      });
+      if (categoryRef.current !== category) {
+        return;
+      }
+      const page = response.data;
+      if (afterId === null) {
+        setTotalProducts(page.total);
+      }
+      setNextAfterId(page.next_after_id);
 
-        const formattedProducts: Product[] = stockData.map((item: any) => ({
+      const formattedProducts: Product[] = page.items.map((item: any) => ({
           id: item.id.toString(),
           name: item.item_name,
           categoryId: item.item_category,
@@ -57,28 +82,41 @@ const Products = () => {
           costPrice: 0,
           sellingPrice: 0,
           lastUpdated: new Date(item.date).toLocaleDateString()
-        }));
-
-        setProducts(formattedProducts);
-
-        const uniqueCategories: Category[] = Array.from(
-          new Set(formattedProducts.map(p => p.categoryId))
-        ).map(cat => ({
-          id: cat,
-          name: cat,
-          description: `${cat} products`
-        }));
-
-        setCategories(uniqueCategories);
-      } catch (error) {
-        console.error("Error fetching stock data:", error);
-        toast({ title: "Error", description: "Failed to load stock data." });
-      }
-    };
+      }));
 
-    fetchStockData();
+      setProducts(prev => afterId === null ? formattedProducts : [...prev, ...formattedProducts]);
+    } catch (error) {
+      console.error("Error fetching stock data:", error);
+      toast({ title: "Error", description: "Failed to load stock data." });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const fetchCategories = async () => {
+    try {
+      const response = await axios.get("/api/stock/categories");
+      setCategories(response.data.map((row: any) => ({
+        id: row.category,
+        name: row.category,
+        description: `${row.category} products`,
+        count: row.count
+      })));
+    } catch (error) {
+      console.error("Error fetching stock categories:", error);
+    }
+  };
+
+  useEffect(() => {
+    fetchCategories();
   }, []);
 
+  // The category filter runs on the server: switching it reloads from the first page
+  useEffect(() => {
+    categoryRef.current = selectedCategory;
+    fetchStockPage(null, selectedCategory);
+  }, [selectedCategory]);
+
   const handleAddCategory = (name: string, description?: string) => {
     const newCategory: Category = {
       id: name,
@@ -156,14 +194,18 @@ const Products = () => {
     });
   };
 
+  const categoryProductCount = (category: Category) =>
+    category.count ?? products.filter(p => p.categoryId === category.id).length;
+
   const handleDeleteCategory = (categoryId: string) => {
-    const categoryProducts = products.filter(p => p.categoryId === categoryId);
-    const categoryName = categories.find(c => c.id === categoryId)?.name;
+    const category = categories.find(c => c.id === categoryId);
+    const categoryName = category?.name;
+    const productCount = category ? categoryProductCount(category) : 0;
 
-    if (categoryProducts.length > 0) {
+    if (productCount > 0) {
       toast({
         title: "Cannot delete category",
-        description: `${categoryName} has ${categoryProducts.length} products. Remove all products first.`,
+        description: `${categoryName} has ${productCount} products. Remove all products first.`,
         variant: "destructive"
       });
       return;
@@ -185,6 +227,7 @@ const Products = () => {
     setEditProductOpen(true);
   };
 
+  // Pages come filtered from the server; this only keeps products added on this page in place
   const filteredProducts = selectedCategory
     ? products.filter(p => p.categoryId === selectedCategory)
     : products;
@@ -225,30 +268,27 @@ const Products = () => {
                 onClick={() => setSelectedCategory(null)}
                 className="h-12 px-4 flex items-center justify-center"
               >
-                <span className="font-medium">All ({products.length})</span>
+                <span className="font-medium">All ({categories.reduce((sum, c) => sum + (c.count ?? 0), 0)})</span>
               </Button>
-              {categories.map((category) => {
-                const categoryProducts = products.filter(p => p.categoryId === category.id);
-                return (
-                  <div key={category.id} className="relative group">
-                    <Button
-                      variant={selectedCategory === category.id ? "default" : "outline"}
-                      onClick={() => setSelectedCategory(category.id)}
-                      className="h-12 px-4 flex items-center justify-center pr-8"
-                    >
-                      <span className="font-medium">{category.name} ({categoryProducts.length})</span>
-                    </Button>
-                    <Button
-                      variant="ghost"
-                      size="sm"
-                      onClick={() => handleDeleteCategory(category.id)}
-                      className="absolute -top-1 -right-1 h-6 w-6 p-0 bg-red-100 hover:bg-red-200 text-red-600 rounded-full opacity-0 group-hover:opacity-100 transition-opacity"
-                    >
-                      <X className="w-3 h-3" />
-                    </Button>
-                  </div>
-                );
-              })}
+              {categories.map((category) => (
+                <div key={category.id} className="relative group">
+                  <Button
+                    variant={selectedCategory === category.id ? "default" : "outline"}
+                    onClick={() => setSelectedCategory(category.id)}
+                    className="h-12 px-4 flex items-center justify-center pr-8"
+                  >
+                    <span className="font-medium">{category.name} ({categoryProductCount(category)})</span>
+                  </Button>
+                  <Button
+                    variant="ghost"
+                    size="sm"
+                    onClick={() => handleDeleteCategory(category.id)}
+                    className="absolute -top-1 -right-1 h-6 w-6 p-0 bg-red-100 hover:bg-red-200 text-red-600 rounded-full opacity-0 group-hover:opacity-100 transition-opacity"
+                  >
+                    <X className="w-3 h-3" />
+                  </Button>
+                </div>
+              ))}
             </div>
           </CardContent>
         </Card>
@@ -261,8 +301,8 @@ const Products = () => {
             </CardTitle>
             <CardDescription>
               {selectedCategory
-                ? `${filteredProducts.length} products in ${categories.find(c => c.id === selectedCategory)?.name}`
-                : `All products in your inventory (${products.length} total)`
+                ? `${totalProducts ?? filteredProducts.length} products in ${categories.find(c => c.id === selectedCategory)?.name}`
+                : `All products in your inventory (${totalProducts ?? products.length} total)`
               }
             </CardDescription>
           </CardHeader>
@@ -307,6 +347,14 @@ const Products = () => {
               ))}
             </div>
 
+            {nextAfterId !== null && (
+              <div className="flex justify-center pt-4">
+                <Button variant="outline" disabled={loadingMore} onClick={() => fetchStockPage(nextAfterId, selectedCategory)}>
+                  {loadingMore ? "Loading..." : `Load more (${products.length} of ${totalProducts ?? "?"})`}
+                </Button>
+              </div>
+            )}
+
             {filteredProducts.length === 0 && (
               <div className="text-center py-12">
                 <Package className="w-12 h-12 text-gray-400 mx-auto mb-4" />